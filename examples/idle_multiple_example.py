@@ -0,0 +1,39 @@
+# Watch several mailboxes in IDLE mode from a single thread by
+# registering every connection's socket with one shared selector.
+
+from selectors import DefaultSelector, EVENT_READ
+
+from imapclient import IMAPClient
+
+HOST = "imap.host.com"
+ACCOUNTS = [("someuser", "password"), ("otheruser", "password")]
+
+selector = DefaultSelector()
+servers = []
+for username, password in ACCOUNTS:
+    server = IMAPClient(HOST)
+    server.login(username, password)
+    server.select_folder("INBOX", readonly=True)
+    server.idle()
+    selector.register(server.socket(), EVENT_READ, server)
+    servers.append(server)
+
+print("Connections are now in IDLE mode, quit with ^c")
+
+try:
+    while True:
+        # Wait for up to 30 seconds for any connection to have data
+        for key, _ in selector.select(timeout=30):
+            server = key.data
+            # The socket is known to be readable so don't wait
+            responses = server.idle_check(timeout=0)
+            print(server.host, "sent:", responses)
+except KeyboardInterrupt:
+    pass
+
+for server in servers:
+    selector.unregister(server.socket())
+    server.idle_done()
+    server.logout()
+selector.close()
+print("\nIDLE mode done")
@@ -6,6 +6,7 @@
 # The 4th part will be either alpha, beta or final.
 
 from .imapclient import *  # noqa: F401,F403
+from .pool import *  # noqa: F401,F403
 from .response_parser import *  # noqa: F401,F403
 from .tls import *  # noqa: F401,F403
 from .version import author as __author__  # noqa: F401
@@ -27,7 +27,7 @@ def parse_to_datetime(timestamp: bytes, normalise: bool = True) -> datetime:
     tz_offset_seconds = time_tuple[-1]
     tz = None
     if tz_offset_seconds is not None:
-        tz = FixedOffset(tz_offset_seconds / 60)
+        tz = FixedOffset.for_offset(tz_offset_seconds / 60)
 
     dt = datetime(*time_tuple[:6], tzinfo=tz)
     if normalise and tz:
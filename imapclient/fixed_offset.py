@@ -3,6 +3,7 @@
 # Please see http://en.wikipedia.org/wiki/BSD_licenses
 
 import datetime
+import functools
 import time
 from typing import Optional
 
@@ -42,4 +43,18 @@ class FixedOffset(datetime.tzinfo):
             offset = time.altzone
         else:
             offset = time.timezone
-        return cls(-offset // 60)
+        return cls.for_offset(-offset // 60)
+
+    @staticmethod
+    def for_offset(minutes: float) -> "FixedOffset":
+        """Return a FixedOffset instance for *minutes* east of UTC.
+
+        Instances are immutable so they are shared between callers
+        asking for the same offset.
+        """
+        return _cached_fixed_offset(minutes)
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_fixed_offset(minutes: float) -> FixedOffset:
+    return FixedOffset(minutes)
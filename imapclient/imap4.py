@@ -7,7 +7,25 @@ import socket
 from typing import Optional
 
 
-class IMAP4WithTimeout(imaplib.IMAP4):
+class GreetingCapabilitiesMixin(imaplib.IMAP4):
+    """Use the capabilities advertised in the server greeting.
+
+    imaplib always sends a CAPABILITY command after connecting. Most
+    servers already include their capabilities in the greeting
+    (``* OK [CAPABILITY ...]``) so use those when present, saving a
+    round trip.
+    """
+
+    def _get_capabilities(self) -> None:
+        greeting = self.untagged_responses.pop("CAPABILITY", None)
+        if greeting and isinstance(greeting[-1], bytes):
+            capabilities = str(greeting[-1], self._encoding).upper()
+            self.capabilities = tuple(capabilities.split())
+            return
+        super()._get_capabilities()  # type: ignore[misc]
+
+
+class IMAP4WithTimeout(GreetingCapabilitiesMixin):
     def __init__(self, address: str, port: int, timeout: Optional[float]) -> None:
         self._timeout = timeout
         imaplib.IMAP4.__init__(self, address, port)
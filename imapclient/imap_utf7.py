@@ -8,6 +8,7 @@
 # Other variations and examples can be found in the RFC 3501, section 5.1.3.
 
 import binascii
+import re
 from typing import List, Union
 
 
@@ -20,6 +21,10 @@ def encode(s: Union[str, bytes]) -> bytes:
     if not isinstance(s, str):
         return s
 
+    # Printable ASCII other than "&" represents itself
+    if s.isascii() and s.isprintable() and "&" not in s:
+        return s.encode("ascii")
+
     res = bytearray()
 
     b64_buffer: List[str] = []
@@ -55,8 +60,9 @@ def encode(s: Union[str, bytes]) -> bytes:
     return bytes(res)
 
 
-AMPERSAND_ORD = ord("&")
-DASH_ORD = ord("-")
+# Matches a shifted (base64) section: "&" up to the closing "-", or up
+# to the end of the input if it isn't closed
+_SHIFTED_RE = re.compile(rb"&([^-]*)(?:-|\Z)")
 
 
 def decode(s: Union[bytes, str]) -> str:
@@ -68,33 +74,22 @@ def decode(s: Union[bytes, str]) -> str:
     """
     if not isinstance(s, bytes):
         return s
+    if b"&" not in s:
+        # Nothing shifted: the common case for folder names
+        return s.decode("latin-1")
 
+    # split() alternates between literal ASCII runs and the contents
+    # of shifted sections, so only the latter need base64 decoding
+    parts = _SHIFTED_RE.split(s)
     res = []
-    # Store base64 substring that will be decoded once stepping on end shift character
-    b64_buffer = bytearray()
-    for c in s:
-        # Shift character without anything in buffer -> starts storing base64 substring
-        if c == AMPERSAND_ORD and not b64_buffer:
-            b64_buffer.append(c)
-        # End shift char. -> append the decoded buffer to the result and reset it
-        elif c == DASH_ORD and b64_buffer:
-            # Special case &-, representing "&" escaped
-            if len(b64_buffer) == 1:
-                res.append("&")
-            else:
-                res.append(base64_utf7_decode(b64_buffer[1:]))
-            b64_buffer = bytearray()
-        # Still buffering between the shift character and the shift back to ASCII
-        elif b64_buffer:
-            b64_buffer.append(c)
-        # No buffer initialized yet, should be an ASCII printable char
+    for i, part in enumerate(parts):
+        if not i % 2:
+            res.append(part.decode("latin-1"))
+        elif part:
+            res.append(base64_utf7_decode(part))
         else:
-            res.append(chr(c))
-
-    # Decode the remaining buffer if any
-    if b64_buffer:
-        res.append(base64_utf7_decode(b64_buffer[1:]))
-
+            # Special case &-, representing "&" escaped
+            res.append("&")
     return "".join(res)
 
 
@@ -103,6 +98,6 @@ def base64_utf7_encode(buffer: List[str]) -> bytes:
     return binascii.b2a_base64(s).rstrip(b"\n=").replace(b"/", b",")
 
 
-def base64_utf7_decode(s: bytearray) -> str:
+def base64_utf7_decode(s: bytes) -> str:
     s_utf7 = b"+" + s.replace(b",", b"/") + b"-"
     return s_utf7.decode("utf-7")
@@ -5,15 +5,16 @@
 import dataclasses
 import functools
 import imaplib
-import itertools
+import inspect
 import re
 import select
 import socket
 import ssl as ssl_lib
 import sys
+import time
 import warnings
 from datetime import date, datetime
-from logging import getLogger, LoggerAdapter
+from logging import DEBUG, getLogger, LoggerAdapter
 from operator import itemgetter
 from typing import List, Optional
 
@@ -22,7 +23,7 @@ from .datetime_util import datetime_to_INTERNALDATE, format_criteria_date
 from .imap_utf7 import decode as decode_utf7
 from .imap_utf7 import encode as encode_utf7
 from .response_parser import parse_fetch_response, parse_message_list, parse_response
-from .util import assert_imap_protocol, chunk, to_bytes, to_unicode
+from .util import assert_imap_protocol, to_bytes, to_unicode
 
 if hasattr(select, "poll"):
     POLL_SUPPORT = True
@@ -35,6 +36,7 @@ logger = getLogger(__name__)
 
 __all__ = [
     "IMAPClient",
+    "Pipeline",
     "SocketTimeout",
     "DELETED",
     "SEEN",
@@ -106,10 +108,33 @@ _POPULAR_SPECIAL_FOLDERS = {
     JUNK: ("Junk", "Spam"),
 }
 
+# Candidate folder names tried when the server doesn't support NAMESPACE
+_FALLBACK_SPECIAL_CANDIDATES = {
+    flag: tuple(ns[0] + name for ns in _POPULAR_PERSONAL_NAMESPACES for name in names)
+    for flag, names in _POPULAR_SPECIAL_FOLDERS.items()
+}
+
 _RE_SELECT_RESPONSE = re.compile(rb"\[(?P<key>[A-Z-]+)( \((?P<data>.*)\))?\]")
 
+# Conversions applied to the untagged responses of a SELECT command
+_SELECT_RESPONSE_CONVERTERS = {
+    b"EXISTS": lambda value: int(value[0]),
+    b"RECENT": lambda value: int(value[0]),
+    b"UIDNEXT": lambda value: int(value[0]),
+    b"UIDVALIDITY": lambda value: int(value[0]),
+    b"HIGHESTMODSEQ": lambda value: int(value[0]),
+    b"READ-WRITE": lambda value: True,
+    b"FLAGS": lambda value: tuple(value[0][1:-1].split()),
+}
+
+# Matches the common "<number> <keyword>" untagged responses (eg. EXISTS,
+# EXPUNGE, RECENT) which don't need the general response parser.
+_RE_SIMPLE_UNTAGGED = re.compile(rb"(0|[1-9][0-9]*) ([A-Za-z]+)\Z")
+
 
 class Namespace(tuple):
+    __slots__ = ()
+
     def __new__(cls, personal, other, shared):
         return tuple.__new__(cls, (personal, other, shared))
 
@@ -144,6 +169,8 @@ class MailboxQuotaRoots:
     :ivar quota_roots: list of quota roots associated with the mailbox
     """
 
+    __slots__ = ("mailbox", "quota_roots")
+
     mailbox: str
     quota_roots: List[str]
 
@@ -160,6 +187,8 @@ class Quota:
     :ivar limit: the maximum allowed usage of the resource
     """
 
+    __slots__ = ("quota_root", "resource", "usage", "limit")
+
     quota_root: str
     resource: str
     usage: bytes
@@ -169,13 +198,26 @@ class Quota:
 def require_capability(capability):
     """Decorator raising CapabilityError when a capability is not available."""
 
+    def check(client):
+        if not client.has_capability(capability):
+            raise exceptions.CapabilityError(
+                "Server does not support {} capability".format(capability)
+            )
+
     def actual_decorator(func):
+        if inspect.iscoroutinefunction(func):
+            # Keep coroutine functions as such so that the check happens
+            # when the coroutine runs, as for the method's own code
+            @functools.wraps(func)
+            async def async_wrapper(client, *args, **kwargs):
+                check(client)
+                return await func(client, *args, **kwargs)
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(client, *args, **kwargs):
-            if not client.has_capability(capability):
-                raise exceptions.CapabilityError(
-                    "Server does not support {} capability".format(capability)
-                )
+            check(client)
             return func(client, *args, **kwargs)
 
         return wrapper
@@ -227,6 +269,21 @@ class IMAPClient:
     system time). This attribute can be changed between ``fetch()``
     calls if required.
 
+    The *fetch_cache* attribute may be set to a mapping (for example
+    a ``dict``, or a size bounded mapping) in which ``fetch()`` will
+    keep data items which never change for a given UID: ``ENVELOPE``,
+    ``BODYSTRUCTURE``, ``INTERNALDATE``, ``RFC822.SIZE`` and
+    ``RFC822.HEADER``. Later requests for these items are answered
+    from the cache and only messages missing from it are fetched from
+    the server. The cache is only used when *use_uid* is ``True`` and
+    the server reported a ``UIDVALIDITY`` when the folder was
+    selected. It is also only used once the account is known, i.e.
+    after logging in with ``login()``, ``plain_login()``,
+    ``oauth2_login()`` or ``oauthbearer_login()`` with an identity.
+    Entries are keyed by host, account, folder and ``UIDVALIDITY`` so
+    one mapping may be shared by several clients. It defaults to
+    ``None`` (no caching).
+
     Can be used as a context manager to automatically close opened connections:
 
     >>> with IMAPClient(host="imap.foo.org") as client:
@@ -257,7 +314,7 @@ class IMAPClient:
             if ssl:
                 raise ValueError("can't use 'ssl' when 'stream' is True")
         elif port is None:
-            port = ssl and 993 or 143
+            port = 993 if ssl else 143
 
         if ssl and port == 143:
             logger.warning(
@@ -274,6 +331,7 @@ class IMAPClient:
         self.use_uid = use_uid
         self.folder_encode = True
         self.normalise_times = True
+        self.fetch_cache = None
 
         # If the user gives a single timeout value, assume it is the same for
         # connection and read/write operations
@@ -283,7 +341,13 @@ class IMAPClient:
         self._timeout = timeout
         self._starttls_done = False
         self._cached_capabilities = None
+        self._capability_set = frozenset()
+        self._capability_set_source = None
+        self._preauth_capabilities = None
         self._idle_tag = None
+        self._fetch_cache_scope = None
+        self._account = None
+        self._poller = None
 
         self._imap = self._create_IMAP4()
         logger.debug(
@@ -295,8 +359,12 @@ class IMAPClient:
         self._set_read_timeout()
         # Small hack to make imaplib log everything to its own logger
         imaplib_logger = IMAPlibLoggerAdapter(getLogger("imapclient.imaplib"), {})
-        self._imap.debug = 5
+        self._imap.debug = _IMAPlibDebugLevel(imaplib_logger)
         self._imap._mesg = imaplib_logger.debug
+        # Below debug level 4 imaplib keeps the last few lines sent and
+        # received, unredacted, in _cmd_log instead. Don't keep them:
+        # they include passwords and everything goes to the logger anyway.
+        self._imap._log = _discard_imaplib_log
 
     def __enter__(self):
         return self
@@ -401,6 +469,7 @@ class IMAPClient:
         except exceptions.IMAPClientError as e:
             raise exceptions.LoginError(str(e))
 
+        self._account = to_unicode(username)
         logger.debug("Logged in as %s", username)
         return rv
 
@@ -421,9 +490,11 @@ class IMAPClient:
             auth_string += "vendor=%s\1" % vendor
         auth_string += "\1"
         try:
-            return self._command_and_check("authenticate", mech, lambda x: auth_string)
+            rv = self._command_and_check("authenticate", mech, lambda x: auth_string)
         except exceptions.IMAPClientError as e:
             raise exceptions.LoginError(str(e))
+        self._account = user
+        return rv
 
     def oauthbearer_login(self, identity, access_token):
         """Authenticate using the OAUTHBEARER method.
@@ -443,11 +514,13 @@ class IMAPClient:
         # https://tools.ietf.org/html/rfc7628#section-3.1
         auth_string = "%s\1auth=%s\1\1" % (gs2_header, http_authz)
         try:
-            return self._command_and_check(
+            rv = self._command_and_check(
                 "authenticate", "OAUTHBEARER", lambda x: auth_string
             )
         except exceptions.IMAPClientError as e:
             raise exceptions.LoginError(str(e))
+        self._account = identity or None
+        return rv
 
     def plain_login(self, identity, password, authorization_identity=None):
         """Authenticate using the PLAIN method (requires server support)."""
@@ -455,11 +528,13 @@ class IMAPClient:
             authorization_identity = ""
         auth_string = "%s\0%s\0%s" % (authorization_identity, identity, password)
         try:
-            return self._command_and_check(
+            rv = self._command_and_check(
                 "authenticate", "PLAIN", lambda _: auth_string, unpack=True
             )
         except exceptions.IMAPClientError as e:
             raise exceptions.LoginError(str(e))
+        self._account = authorization_identity or identity
+        return rv
 
     def sasl_login(self, mech_name, mech_callable):
         """Authenticate using a provided SASL mechanism (requires server support).
@@ -580,13 +655,10 @@ class IMAPClient:
             if not isinstance(parameters, dict):
                 raise TypeError("'parameters' should be a dictionary")
             args = seq_to_parenstr(
-                _quote(v) for v in itertools.chain.from_iterable(parameters.items())
+                [_quote(v) for item in parameters.items() for v in item]
             )
 
-        typ, data = self._imap._simple_command("ID", args)
-        self._checkok("id", typ, data)
-        typ, data = self._imap._untagged_response(typ, data, "ID")
-        return parse_response(data)
+        return parse_response(self._simple_command_untagged("ID", args))
 
     def capabilities(self):
         """Returns the server capability list.
@@ -612,8 +684,9 @@ class IMAPClient:
 
         # If the server returned an untagged CAPABILITY response
         # (during authentication), cache it and return that.
-        untagged = _dict_bytes_normaliser(self._imap.untagged_responses)
-        response = untagged.pop("CAPABILITY", None)
+        # imaplib keys untagged responses by str but accept bytes too
+        untagged = self._imap.untagged_responses
+        response = untagged.pop("CAPABILITY", None) or untagged.pop(b"CAPABILITY", None)
         if response:
             self._cached_capabilities = self._normalise_capabilites(response[0])
             return self._cached_capabilities
@@ -624,8 +697,14 @@ class IMAPClient:
             return self._cached_capabilities
 
         # Return capabilities that imaplib requested at connection
-        # time (pre-auth)
-        return tuple(to_bytes(c) for c in self._imap.capabilities)
+        # time (pre-auth). The converted tuple is kept while imaplib's
+        # stays the same so that has_capability() can reuse its set.
+        imap_capabilities = self._imap.capabilities
+        preauth = self._preauth_capabilities
+        if preauth is None or preauth[0] is not imap_capabilities:
+            preauth = (imap_capabilities, tuple(to_bytes(c) for c in imap_capabilities))
+            self._preauth_capabilities = preauth
+        return preauth[1]
 
     def _do_capabilites(self):
         raw_response = self._command_and_check("capability", unpack=True)
@@ -642,7 +721,13 @@ class IMAPClient:
         # capabilities may in the future be named SORT2 which is
         # still compatible with the current standard and will not
         # be detected by this method.
-        return to_bytes(capability).upper() in self.capabilities()
+        capabilities = self.capabilities()
+        if capabilities is not self._capability_set_source:
+            # Keep a set of the capabilities for fast lookups, rebuilt
+            # whenever a different capability list is returned.
+            self._capability_set = frozenset(capabilities)
+            self._capability_set_source = capabilities
+        return to_bytes(capability).upper() in self._capability_set
 
     @require_capability("NAMESPACE")
     def namespace(self):
@@ -737,32 +822,26 @@ class IMAPClient:
         return self._do_list("LSUB", directory, pattern)
 
     def _do_list(self, cmd, directory, pattern):
+        return self._proc_folder_list(self._do_list_raw(cmd, directory, pattern))
+
+    def _do_list_raw(self, cmd, directory, pattern):
         directory = self._normalise_folder(directory)
         pattern = self._normalise_folder(pattern)
-        typ, dat = self._imap._simple_command(cmd, directory, pattern)
-        self._checkok(cmd, typ, dat)
-        typ, dat = self._imap._untagged_response(typ, dat, cmd)
-        return self._proc_folder_list(dat)
+        return self._simple_command_untagged(cmd, directory, pattern)
 
     def _proc_folder_list(self, folder_data):
         # Filter out empty strings and None's.
         # This also deals with the special case of - no 'untagged'
         # responses (ie, no folders). This comes back as [None].
-        folder_data = [item for item in folder_data if item not in (b"", None)]
-
-        ret = []
-        parsed = parse_response(folder_data)
-        for flags, delim, name in chunk(parsed, size=3):
-            if isinstance(name, int):
-                # Some IMAP implementations return integer folder names
-                # with quotes. These get parsed to ints so convert them
-                # back to strings.
-                name = str(name)
-            elif self.folder_encode:
-                name = decode_utf7(name)
-
-            ret.append((flags, delim, name))
-        return ret
+        folder_data = [item for item in folder_data if item]
+        if not folder_data:
+            return []
+
+        folder_encode = self.folder_encode
+        return [
+            (flags, delim, _decode_folder_name(name, folder_encode))
+            for flags, delim, name in as_triplets(parse_response(folder_data))
+        ]
 
     def find_special_folder(self, folder_flag):
         """Try to locate a special folder, like the Sent or Trash folder.
@@ -785,16 +864,17 @@ class IMAPClient:
         # Detect folder by looking for common names
         # We only look for folders in the "personal" namespace of the user
         if self.has_capability("NAMESPACE"):
-            personal_namespaces = self.namespace().personal
+            names = _POPULAR_SPECIAL_FOLDERS.get(folder_flag, ())
+            candidates = [
+                ns[0] + name for ns in self.namespace().personal for name in names
+            ]
         else:
-            personal_namespaces = _POPULAR_PERSONAL_NAMESPACES
+            candidates = _FALLBACK_SPECIAL_CANDIDATES.get(folder_flag, ())
 
-        for personal_namespace in personal_namespaces:
-            for pattern in _POPULAR_SPECIAL_FOLDERS.get(folder_flag, tuple()):
-                pattern = personal_namespace[0] + pattern
-                sent_folders = self.list_folders(pattern=pattern)
-                if sent_folders:
-                    return sent_folders[0][2]
+        for pattern in candidates:
+            sent_folders = self.list_folders(pattern=pattern)
+            if sent_folders:
+                return sent_folders[0][2]
 
         return None
 
@@ -816,8 +896,14 @@ class IMAPClient:
              b'UIDNEXT': 11,
              b'UIDVALIDITY': 1239278212}
         """
-        self._command_and_check("select", self._normalise_folder(folder), readonly)
-        return self._process_select_response(self._imap.untagged_responses)
+        self._fetch_cache_scope = None
+        folder = self._normalise_folder(folder)
+        self._command_and_check("select", folder, readonly)
+        resp = self._process_select_response(self._imap.untagged_responses)
+        uidvalidity = resp.get(b"UIDVALIDITY")
+        if uidvalidity is not None and self._account is not None:
+            self._fetch_cache_scope = (self.host, self._account, folder, uidvalidity)
+        return resp
 
     @require_capability("UNSELECT")
     def unselect_folder(self):
@@ -829,42 +915,48 @@ class IMAPClient:
         Returns the UNSELECT response string returned by the server.
         """
         logger.debug("< UNSELECT")
+        self._fetch_cache_scope = None
         # IMAP4 class has no `unselect` method so we can't use `_command_and_check` there
         _typ, data = self._imap._simple_command("UNSELECT")
         return data[0]
 
     def _process_select_response(self, resp):
-        untagged = _dict_bytes_normaliser(resp)
         out = {}
-
-        # imaplib doesn't parse these correctly (broken regex) so replace
-        # with the raw values out of the OK section
-        for line in untagged.get("OK", []):
-            match = _RE_SELECT_RESPONSE.match(line)
-            if match:
-                key = match.group("key")
-                if key == b"PERMANENTFLAGS":
-                    out[key] = tuple(match.group("data").split())
-
-        for key, value in untagged.items():
-            key = key.upper()
-            if key in (b"OK", b"PERMANENTFLAGS"):
-                continue  # already handled above
-            if key in (
-                b"EXISTS",
-                b"RECENT",
-                b"UIDNEXT",
-                b"UIDVALIDITY",
-                b"HIGHESTMODSEQ",
-            ):
-                value = int(value[0])
-            elif key == b"READ-WRITE":
-                value = True
-            elif key == b"FLAGS":
-                value = tuple(value[0][1:-1].split())
-            out[key] = value
+        converters = _SELECT_RESPONSE_CONVERTERS
+        for key, value in resp.items():
+            key = to_bytes(key).upper()
+            if key == b"OK":
+                # imaplib doesn't parse these correctly (broken regex) so
+                # replace with the raw values out of the OK section
+                for line in value:
+                    match = _RE_SELECT_RESPONSE.match(line)
+                    if match and match.group("key") == b"PERMANENTFLAGS":
+                        out[b"PERMANENTFLAGS"] = tuple(match.group("data").split())
+            elif key != b"PERMANENTFLAGS":
+                convert = converters.get(key)
+                out[key] = convert(value) if convert else value
         return out
 
+    def pipeline(self):
+        """Return a :py:class:`Pipeline` which sends commands to the
+        server without waiting for the response to each one.
+
+        Use it as a context manager. Commands are written to the
+        server as soon as they are queued and their responses are
+        collected, in order, when the ``with`` block exits. The
+        results are then available via the *results* attribute::
+
+            with client.pipeline() as p:
+                p.add_flags([1, 2], [SEEN])
+                p.fetch([3, 4], ["FLAGS"])
+            flags, fetched = p.results
+
+        This saves a round-trip per command when many small commands
+        are issued. No other IMAPClient methods should be called
+        while the ``with`` block is active.
+        """
+        return Pipeline(self)
+
     def noop(self):
         """Execute the NOOP command.
 
@@ -910,9 +1002,16 @@ class IMAPClient:
         Polls the socket for events telling us it's available to read.
         This implementation is more scalable because it ALLOWS your process
         to have more than 1024 file descriptors.
+
+        The poll object is kept between calls so that repeated
+        ``idle_check()`` calls don't have to set it up again.
         """
-        poller = select.poll()
-        poller.register(sock.fileno(), select.POLLIN)
+        fileno = sock.fileno()
+        if self._poller is None or self._poller[0] != fileno:
+            poller = select.poll()
+            poller.register(fileno, select.POLLIN)
+            self._poller = (fileno, poller)
+        poller = self._poller[1]
         timeout = timeout * 1000 if timeout is not None else None
         return poller.poll(timeout)
 
@@ -979,6 +1078,45 @@ class IMAPClient:
             sock.setblocking(1)
             self._set_read_timeout()
 
+    @require_capability("IDLE")
+    async def idle_wait(self, timeout=None):
+        """Coroutine waiting for IDLE responses sent by the server.
+
+        This is an alternative to ``idle_check()`` for use with
+        :py:mod:`asyncio`. Rather than blocking the calling thread, it
+        waits for the connection's socket to become readable using the
+        running event loop, then returns the received IDLE responses
+        as per ``idle_check()``. If *timeout* is provided, an empty
+        list is returned if nothing arrives within that many seconds.
+
+        This allows a single thread to watch a large number of
+        connections in IDLE mode::
+
+            await asyncio.gather(*(client.idle_wait() for client in clients))
+
+        The event loop must support :py:meth:`asyncio.loop.add_reader`
+        (the default selector based loops do).
+        """
+        # Imported here so that synchronous users don't pay for it
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        fileno = self.socket().fileno()
+        readable = loop.create_future()
+
+        def on_readable():
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(fileno, on_readable)
+        try:
+            await asyncio.wait_for(readable, timeout)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            loop.remove_reader(fileno)
+        return self.idle_check(timeout=0)
+
     @require_capability("IDLE")
     def idle_done(self):
         """Take the server out of IDLE mode.
@@ -998,6 +1136,56 @@ class IMAPClient:
         self._imap.send(b"DONE\r\n")
         return self._consume_until_tagged_response(self._idle_tag, "IDLE")
 
+    def watch_folder(self, folder, callback, poll_interval=60, idle_timeout=29 * 60):
+        """Watch *folder* for changes, calling *callback* each time
+        something changes.
+
+        If the server supports IDLE, *folder* is selected (read-only)
+        and IDLE mode is used so that changes are reported as soon as
+        they happen. *callback* is given the list of IDLE responses as
+        returned by ``idle_check()``. IDLE mode is renewed every
+        *idle_timeout* seconds (by default just under the 30 minutes
+        allowed by :rfc:`2177`).
+
+        Otherwise the folder is polled using ``folder_status()`` every
+        *poll_interval* seconds and *callback* is given a dictionary
+        of the ``b'MESSAGES'`` and ``b'UIDNEXT'`` status items which
+        changed since the previous poll.
+
+        This method blocks until *callback* returns ``False``.
+        """
+        if self.has_capability("IDLE"):
+            self._watch_folder_idle(folder, callback, idle_timeout)
+        else:
+            self._watch_folder_poll(folder, callback, poll_interval)
+
+    def _watch_folder_idle(self, folder, callback, idle_timeout):
+        self.select_folder(folder, readonly=True)
+        while True:
+            self.idle()
+            try:
+                responses = self.idle_check(timeout=idle_timeout)
+            finally:
+                _, done_responses = self.idle_done()
+            responses.extend(done_responses)
+            if responses and callback(responses) is False:
+                return
+
+    def _watch_folder_poll(self, folder, callback, poll_interval):
+        what = ("MESSAGES", "UIDNEXT")
+        status = self.folder_status(folder, what)
+        while True:
+            time.sleep(poll_interval)
+            new_status = self.folder_status(folder, what)
+            changes = {
+                key: value
+                for key, value in new_status.items()
+                if status.get(key) != value
+            }
+            status = new_status
+            if changes and callback(changes) is False:
+                return
+
     def folder_status(self, folder, what=None):
         """Return the status of *folder*.
 
@@ -1008,22 +1196,41 @@ class IMAPClient:
         Returns a dictionary of the status items for the folder with
         keys matching *what*.
         """
-        if what is None:
-            what = ("MESSAGES", "RECENT", "UIDNEXT", "UIDVALIDITY", "UNSEEN")
-        else:
-            what = normalise_text_list(what)
-        what_ = "(%s)" % (" ".join(what))
+        return self._complete_status(self._send_status(folder, what))
+
+    def folder_statuses(self, folders, what=None):
+        """Return the status of each folder in *folders*.
+
+        This is equivalent to calling :py:meth:`.folder_status` for
+        each folder but the ``STATUS`` commands are pipelined so the
+        server's responses are waited for once, rather than once per
+        folder.
+
+        Returns a dictionary mapping each folder to its status
+        dictionary.
+        """
+        folders = list(folders)
+        with self.pipeline() as p:
+            for folder in folders:
+                p.folder_status(folder, what)
+        return dict(zip(folders, p.results))
+
+    def _send_status(self, folder, what):
+        return self._imap._command(
+            "STATUS", self._normalise_folder(folder), _status_items(what)
+        )
 
-        fname = self._normalise_folder(folder)
-        data = self._command_and_check("status", fname, what_)
-        response = parse_response(data)
-        status_items = response[-1]
-        return dict(as_pairs(status_items))
+    def _complete_status(self, tag):
+        typ, data = self._imap._command_complete("STATUS", tag)
+        self._checkok("status", typ, data)
+        typ, data = self._imap._untagged_response(typ, data, "STATUS")
+        return _parse_status(data)
 
     def close_folder(self):
         """Close the currently selected folder, returning the server
         response string.
         """
+        self._fetch_cache_scope = None
         return self._command_and_check("close", unpack=True)
 
     def create_folder(self, folder):
@@ -1049,7 +1256,10 @@ class IMAPClient:
 
     def folder_exists(self, folder):
         """Return ``True`` if *folder* exists on the server."""
-        return len(self.list_folders("", folder)) > 0
+        # Only the presence of a LIST response matters so there's no
+        # need to parse it. No folders comes back as [None].
+        data = self._do_list_raw("LIST", "", folder)
+        return any(item not in (b"", None) for item in data)
 
     def subscribe_folder(self, folder):
         """Subscribe to *folder*, returning the server response string."""
@@ -1121,6 +1331,57 @@ class IMAPClient:
         """
         return self._search(criteria, charset)
 
+    def search_fetch(self, criteria, data, charset=None):
+        """Fetch *data* for the messages in the currently selected
+        folder which match *criteria*.
+
+        This is equivalent to calling :py:meth:`.fetch` with the
+        result of :py:meth:`.search` and returns the same as
+        :py:meth:`.fetch`. *criteria* and *charset* are as per
+        :py:meth:`.search` and *data* is as per :py:meth:`.fetch`.
+
+        If the server supports the ``SEARCHRES`` extension
+        (:rfc:`5182`), the search result is saved on the server and
+        the ``FETCH`` refers to it, so both commands are sent at once.
+        This saves a round trip and the message ids never have to be
+        transferred. Otherwise the two commands are issued one after
+        the other.
+        """
+        if not self.has_capability("SEARCHRES"):
+            messages = self.search(criteria, charset)
+            return self.fetch(messages, data) if messages else {}
+
+        args = [b"RETURN", b"(SAVE)"]
+        if charset:
+            args.extend([b"CHARSET", to_bytes(charset)])
+        args.extend(_normalise_search_criteria(criteria, charset))
+        search_tag = self._send_raw_command(b"SEARCH", args)
+        fetch_tag = self._send_fetch("$", data, None)
+
+        try:
+            typ, search_data = self._imap._command_complete("SEARCH", search_tag)
+        except exceptions.IMAPClientAbortError:
+            raise
+        except exceptions.IMAPClientError as e:
+            # imaplib raises for BAD. The FETCH response must still be
+            # read so the connection stays usable, but the SEARCH error
+            # is the one to report.
+            try:
+                self._complete_fetch(fetch_tag)
+            except exceptions.IMAPClientAbortError:
+                raise
+            except exceptions.IMAPClientError:
+                pass
+            criteria_error = _invalid_criteria_error(e, criteria)
+            if criteria_error:
+                raise criteria_error
+            raise
+        try:
+            return self._complete_fetch(fetch_tag)
+        finally:
+            # If the SEARCH failed, that's the error to report
+            self._checkok("search", typ, search_data)
+
     @require_capability("X-GM-EXT-1")
     def gmail_search(self, query, charset="UTF-8"):
         """Search using Gmail's X-GM-RAW attribute.
@@ -1147,23 +1408,9 @@ class IMAPClient:
         try:
             data = self._raw_command_untagged(b"SEARCH", args)
         except imaplib.IMAP4.error as e:
-            # Make BAD IMAP responses easier to understand to the user, with a link to the docs
-            m = re.match(r"SEARCH command error: BAD \[(.+)\]", str(e))
-            if m:
-                raise exceptions.InvalidCriteriaError(
-                    "{original_msg}\n\n"
-                    "This error may have been caused by a syntax error in the criteria: "
-                    "{criteria}\nPlease refer to the documentation for more information "
-                    "about search criteria syntax..\n"
-                    "https://imapclient.readthedocs.io/en/master/#imapclient.IMAPClient.search".format(
-                        original_msg=m.group(1),
-                        criteria=(
-                            '"%s"' % criteria
-                            if not isinstance(criteria, list)
-                            else criteria
-                        ),
-                    )
-                )
+            criteria_error = _invalid_criteria_error(e, criteria)
+            if criteria_error:
+                raise criteria_error
 
             # If the exception is not from a BAD IMAP response, re-raise as-is
             raise
@@ -1199,7 +1446,7 @@ class IMAPClient:
         ]
         args.extend(_normalise_search_criteria(criteria, charset))
         ids = self._raw_command_untagged(b"SORT", args, unpack=True)
-        return [int(i) for i in ids.split()]
+        return list(map(int, ids.split()))
 
     def thread(self, algorithm="REFERENCES", criteria="ALL", charset="UTF-8"):
         """Return a list of messages threads from the currently
@@ -1272,6 +1519,59 @@ class IMAPClient:
         """
         return self._store(b"FLAGS", messages, flags, b"FLAGS", silent=silent)
 
+    def batch_flags(self, operations, silent=False):
+        """Apply several flag changes to messages in the currently
+        selected folder.
+
+        *operations* is a sequence of ``(action, messages, flags)``
+        tuples where *action* is one of ``"add"``, ``"remove"`` or
+        ``"set"`` and *messages* and *flags* are as per
+        :py:meth:`.add_flags`. For example::
+
+            c.batch_flags([
+                ("add", [1, 2, 3], [SEEN]),
+                ("add", [7], [SEEN]),
+                ("add", [4, 5], [DELETED]),
+            ])
+
+        Consecutive operations with the same action and flags are
+        combined into a single ``STORE`` command and the resulting
+        commands are pipelined, so the example above costs one round
+        trip. Commands are sent in the order of *operations*, so later
+        operations are applied after earlier ones as if each had been
+        made separately.
+
+        Returns the flags set for each modified message (see
+        *get_flags*), or None if *silent* is true.
+        """
+        groups = []
+        for action, messages, flags in operations:
+            try:
+                queue = _FLAG_ACTIONS[action]
+            except KeyError:
+                raise ValueError("unknown flag action: %r" % (action,))
+            if isinstance(messages, (int, str, bytes)):
+                messages = [messages]
+            key = (queue, tuple(normalise_text_list(flags)))
+            # Only merge with the previous operation: merging across a
+            # different operation could reorder changes to the same message
+            if groups and groups[-1][0] == key:
+                groups[-1][1].extend(messages)
+            else:
+                groups.append((key, list(messages)))
+
+        with self.pipeline() as p:
+            for (queue, flags), messages in groups:
+                # Merged operations may repeat a message
+                queue(p, list(dict.fromkeys(messages)), flags, silent=silent)
+
+        if silent:
+            return None
+        out = {}
+        for result in p.results:
+            out.update(result)
+        return out
+
     def get_gmail_labels(self, messages):
         """Return the label set for each message in *messages* in the
         currently selected folder.
@@ -1375,10 +1675,110 @@ class IMAPClient:
                     b'INTERNALDATE': datetime.datetime(2011, 2, 24, 19, 30, 36),
                     b'SEQ': 110}}
 
+        If *fetch_cache* is set, messages whose requested items were
+        all found in the cache have no *SEQ* entry.
         """
         if not messages:
             return {}
 
+        cacheable = self._cacheable_fetch_items(data, modifiers)
+        if cacheable:
+            return self._fetch_with_cache(messages, data, cacheable)
+        tag = self._send_fetch(messages, data, modifiers)
+        return self._complete_fetch(tag)
+
+    def _cacheable_fetch_items(self, data, modifiers):
+        if self.fetch_cache is None or self._fetch_cache_scope is None:
+            return []
+        if not self.use_uid or modifiers:
+            return []
+        items = [to_bytes(item.upper()) for item in normalise_text_list(data)]
+        return [item for item in items if item in _IMMUTABLE_FETCH_ITEMS]
+
+    def _fetch_with_cache(self, messages, data, cacheable):
+        cache = self.fetch_cache
+        scope = self._fetch_cache_scope
+
+        hits = {}
+        misses = messages
+        msgids = [messages] if isinstance(messages, int) else messages
+        # Only explicit lists of UIDs can be looked up in the cache
+        if isinstance(msgids, (list, tuple, range)) and all(
+            isinstance(msgid, int) for msgid in msgids
+        ):
+            misses = []
+            for msgid in msgids:
+                cached = {}
+                for item in cacheable:
+                    value = cache.get(scope + (msgid, item), _not_present)
+                    if value is _not_present:
+                        misses.append(msgid)
+                        break
+                    cached[item] = value
+                else:
+                    hits[msgid] = cached
+
+        out = {}
+        if misses:
+            out = self._complete_fetch(self._send_fetch(misses, data, None))
+            for msgid, msg_data in out.items():
+                for item in cacheable:
+                    if item in msg_data:
+                        cache[scope + (msgid, item)] = msg_data[item]
+
+        uncached = [
+            item
+            for item in normalise_text_list(data)
+            if to_bytes(item.upper()) not in cacheable
+        ]
+        if hits and uncached:
+            fetched = self._complete_fetch(self._send_fetch(list(hits), uncached, None))
+            # Messages missing from the response have been expunged
+            for msgid, msg_data in fetched.items():
+                if msgid in hits:
+                    msg_data.update(hits[msgid])
+                    out[msgid] = msg_data
+        else:
+            out.update(hits)
+        return out
+
+    def fetch_iter(self, messages, data, modifiers=None):
+        """Retrieve selected *data* associated with one or more
+        *messages*, yielding results as they are received.
+
+        The arguments are as per :py:meth:`.fetch`. Instead of
+        returning a dictionary once the whole response has arrived,
+        ``(msgid, data)`` tuples are yielded as soon as each FETCH
+        response is read from the server. This lets processing start
+        early and avoids holding every message in memory when
+        retrieving large amounts of data such as full message bodies.
+
+        Unlike :py:meth:`.fetch`, data for a message that the server
+        splits over several FETCH responses is not merged: the message
+        will be yielded once per response.
+
+        The returned iterator must be consumed completely before any
+        other command is issued on this connection.
+        """
+        if not messages:
+            return
+
+        tag = self._send_fetch(messages, data, modifiers)
+        tagged_commands = self._imap.tagged_commands
+        untagged_responses = self._imap.untagged_responses
+        while not tagged_commands[tag]:
+            self._imap._get_response()
+            fetch_data = untagged_responses.pop("FETCH", None)
+            if fetch_data:
+                parsed = parse_fetch_response(
+                    fetch_data, self.normalise_times, self.use_uid
+                )
+                yield from parsed.items()
+
+        typ, data = self._imap._command_complete("FETCH", tag)
+        self._checkok("fetch", typ, data)
+
+    def _send_fetch(self, messages, data, modifiers):
         args = [
             "FETCH",
             join_message_ids(messages),
@@ -1387,7 +1787,9 @@ class IMAPClient:
         ]
         if self.use_uid:
             args.insert(0, "UID")
-        tag = self._imap._command(*args)
+        return self._imap._command(*args)
+
+    def _complete_fetch(self, tag):
         typ, data = self._imap._command_complete("FETCH", tag)
         self._checkok("fetch", typ, data)
         typ, data = self._imap._untagged_response(typ, data, "FETCH")
@@ -1397,7 +1799,9 @@ class IMAPClient:
         """Append a message to *folder*.
 
         *msg* should be a string contains the full message including
-        headers.
+        headers. Messages given as ``bytes``, ``bytearray`` or
+        ``memoryview`` are passed through as-is, avoiding an extra
+        copy of large messages.
 
         *flags* should be a sequence of message flags to set. If not
         specified no flags will be set.
@@ -1545,9 +1949,9 @@ class IMAPClient:
         access controls for *folder*.
         """
         data = self._command_and_check("getacl", self._normalise_folder(folder))
-        parts = list(response_lexer.TokenSource(data))
-        parts = parts[1:]  # First item is folder name
-        return [(parts[i], parts[i + 1]) for i in range(0, len(parts), 2)]
+        tokens = iter(response_lexer.TokenSource(data))
+        next(tokens, None)  # First item is folder name
+        return list(as_pairs(tokens))
 
     @require_capability("ACL")
     def setacl(self, folder, who, what):
@@ -1651,6 +2055,15 @@ class IMAPClient:
         self._checkok(command, typ, data)
         return data[0], resps
 
+    def _simple_command_untagged(self, command, *args):
+        """Run *command* with imaplib, check it succeeded and return
+        the untagged responses of the same name.
+        """
+        typ, data = self._imap._simple_command(command, *args)
+        self._checkok(command, typ, data)
+        typ, data = self._imap._untagged_response(typ, data, command)
+        return data
+
     def _raw_command_untagged(
         self, command, args, response_name=None, unpack=False, uid=True
     ):
@@ -1675,6 +2088,13 @@ class IMAPClient:
         *command* should be specified as bytes.
         *args* should be specified as a list of bytes.
         """
+        tag = self._send_raw_command(command, args, uid)
+        return self._imap._command_complete(to_unicode(command.upper()), tag)
+
+    def _send_raw_command(self, command, args, uid=True):
+        """Send a command as per _raw_command, returning its tag
+        without waiting for the response.
+        """
         command = command.upper()
 
         if isinstance(args, tuple):
@@ -1713,11 +2133,13 @@ class IMAPClient:
         if line:
             out = b" ".join(line)
             logger.debug("> %s", out)
-            self._imap.send(out)
-
-        self._imap.send(b"\r\n")
+            # Commands without literals (the common case) are sent in a
+            # single write
+            self._imap.send(out + b"\r\n")
+        else:
+            self._imap.send(b"\r\n")
 
-        return self._imap._command_complete(to_unicode(command), tag)
+        return tag
 
     def _send_literal(self, tag, item):
         """Send a single literal for the command with *tag*."""
@@ -1761,41 +2183,48 @@ class IMAPClient:
         self._check_resp("OK", command, typ, data)
 
     def _gm_label_store(self, cmd, messages, labels, silent):
-        response = self._store(
-            cmd, messages, self._normalise_labels(labels), b"X-GM-LABELS", silent=silent
-        )
-        return (
-            {msg: utf7_decode_sequence(labels) for msg, labels in response.items()}
-            if response
-            else None
+        return self._store(
+            cmd,
+            messages,
+            self._normalise_labels(labels),
+            b"X-GM-LABELS",
+            silent=silent,
+            convert=_decode_gm_label_response,
         )
 
-    def _store(self, cmd, messages, flags, fetch_key, silent):
+    def _store(self, cmd, messages, flags, fetch_key, silent, convert=None):
         """Worker function for the various flag manipulation methods.
 
-        *cmd* is the STORE command to use (eg. '+FLAGS').
+        *cmd* is the STORE command to use (eg. '+FLAGS'). If given,
+        *convert* is applied to the response before it is returned.
         """
         if not messages:
-            return {}
+            return convert({}) if convert else {}
+        tag = self._send_store(cmd, messages, flags, silent)
+        response = self._complete_store(tag, fetch_key, silent)
+        return convert(response) if convert else response
+
+    def _send_store(self, cmd, messages, flags, silent):
         if silent:
             cmd += b".SILENT"
+        args = ["STORE", join_message_ids(messages), cmd, seq_to_parenstr(flags)]
+        if self.use_uid:
+            args.insert(0, "UID")
+        return self._imap._command(*args)
 
-        data = self._command_and_check(
-            "store", join_message_ids(messages), cmd, seq_to_parenstr(flags), uid=True
-        )
+    def _complete_store(self, tag, fetch_key, silent):
+        typ, data = self._imap._command_complete("STORE", tag)
+        self._checkok("store", typ, data)
+        typ, data = self._imap._untagged_response(typ, data, "FETCH")
         if silent:
             return None
         return self._filter_fetch_dict(parse_fetch_response(data), fetch_key)
 
     def _filter_fetch_dict(self, fetch_dict, key):
-        return dict((msgid, data[key]) for msgid, data in fetch_dict.items())
+        return {msgid: data[key] for msgid, data in fetch_dict.items()}
 
     def _normalise_folder(self, folder_name):
-        if isinstance(folder_name, bytes):
-            folder_name = folder_name.decode("ascii")
-        if self.folder_encode:
-            folder_name = encode_utf7(folder_name)
-        return _quote(folder_name)
+        return _normalise_folder(folder_name, self.folder_encode)
 
     def _normalise_labels(self, labels):
         if isinstance(labels, (str, bytes)):
@@ -1811,6 +2240,178 @@ class IMAPClient:
             pass
 
 
+class Pipeline:
+    """Commands queued on an IMAPClient connection whose responses
+    are read once the ``with`` block exits.
+
+    Instances are created by :py:meth:`IMAPClient.pipeline`. The
+    queueing methods accept the same arguments as the
+    :py:class:`IMAPClient` methods of the same name.
+
+    :ivar results: list of the results of each queued command, in the
+        order the commands were queued. Only set once the ``with``
+        block has exited without error.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._pending = []
+        self.results = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Read the responses to all queued commands.
+
+        Every pending response is consumed, even if one of the
+        commands fails, so that the connection remains usable. The
+        first error encountered is then raised.
+        """
+        pending, self._pending = self._pending, []
+        results = []
+        error = None
+        for complete in pending:
+            try:
+                results.append(complete())
+            except exceptions.IMAPClientAbortError:
+                if exc_type is None:
+                    raise
+                # Don't hide the error raised in the with block
+                return
+            except exceptions.IMAPClientError as e:
+                results.append(None)
+                if error is None:
+                    error = e
+        if exc_type is None:
+            if error is not None:
+                raise error
+            self.results = results
+
+    def _queue_result(self, value):
+        self._pending.append(lambda: value)
+
+    def fetch(self, messages, data, modifiers=None):
+        """Queue a FETCH command (see :py:meth:`IMAPClient.fetch`)."""
+        if not messages:
+            self._queue_result({})
+            return
+        tag = self._client._send_fetch(messages, data, modifiers)
+        self._pending.append(functools.partial(self._client._complete_fetch, tag))
+
+    def folder_status(self, folder, what=None):
+        """Queue a STATUS command (see :py:meth:`IMAPClient.folder_status`)."""
+        tag = self._client._send_status(folder, what)
+        self._pending.append(functools.partial(self._client._complete_status, tag))
+
+    def add_flags(self, messages, flags, silent=False):
+        """Queue adding *flags* to *messages* (see
+        :py:meth:`IMAPClient.add_flags`).
+        """
+        self._store(b"+FLAGS", messages, flags, b"FLAGS", silent=silent)
+
+    def remove_flags(self, messages, flags, silent=False):
+        """Queue removing *flags* from *messages* (see
+        :py:meth:`IMAPClient.remove_flags`).
+        """
+        self._store(b"-FLAGS", messages, flags, b"FLAGS", silent=silent)
+
+    def set_flags(self, messages, flags, silent=False):
+        """Queue setting the *flags* for *messages* (see
+        :py:meth:`IMAPClient.set_flags`).
+        """
+        self._store(b"FLAGS", messages, flags, b"FLAGS", silent=silent)
+
+    def delete_messages(self, messages, silent=False):
+        """Queue deleting *messages* (see
+        :py:meth:`IMAPClient.delete_messages`).
+        """
+        self.add_flags(messages, DELETED, silent=silent)
+
+    def add_gmail_labels(self, messages, labels, silent=False):
+        """Queue adding *labels* to *messages* (see
+        :py:meth:`IMAPClient.add_gmail_labels`).
+        """
+        self._gm_label_store(b"+X-GM-LABELS", messages, labels, silent)
+
+    def remove_gmail_labels(self, messages, labels, silent=False):
+        """Queue removing *labels* from *messages* (see
+        :py:meth:`IMAPClient.remove_gmail_labels`).
+        """
+        self._gm_label_store(b"-X-GM-LABELS", messages, labels, silent)
+
+    def set_gmail_labels(self, messages, labels, silent=False):
+        """Queue setting the *labels* for *messages* (see
+        :py:meth:`IMAPClient.set_gmail_labels`).
+        """
+        self._gm_label_store(b"X-GM-LABELS", messages, labels, silent)
+
+    def _gm_label_store(self, cmd, messages, labels, silent):
+        self._store(
+            cmd,
+            messages,
+            self._client._normalise_labels(labels),
+            b"X-GM-LABELS",
+            silent=silent,
+            convert=_decode_gm_label_response,
+        )
+
+    def _store(self, cmd, messages, flags, fetch_key, silent, convert=None):
+        if not messages:
+            self._queue_result(convert({}) if convert else {})
+            return
+        tag = self._client._send_store(cmd, messages, flags, silent)
+
+        def complete():
+            response = self._client._complete_store(tag, fetch_key, silent)
+            return convert(response) if convert else response
+
+        self._pending.append(complete)
+
+
+@functools.lru_cache(maxsize=512)
+def _normalise_folder(folder_name, folder_encode):
+    # Cached as the same folder names tend to be used over and over
+    if isinstance(folder_name, bytes):
+        folder_name = folder_name.decode("ascii")
+    if folder_encode:
+        folder_name = encode_utf7(folder_name)
+    return _quote(folder_name)
+
+
+def _decode_folder_name(name, folder_encode):
+    if isinstance(name, int):
+        # Some IMAP implementations return integer folder names
+        # with quotes. These get parsed to ints so convert them
+        # back to strings.
+        return str(name)
+    if folder_encode:
+        return decode_utf7(name)
+    return name
+
+
+def _status_items(what):
+    if what is None:
+        what = ("MESSAGES", "RECENT", "UIDNEXT", "UIDVALIDITY", "UNSEEN")
+    else:
+        what = normalise_text_list(what)
+    return "(%s)" % " ".join(what)
+
+
+def _parse_status(data):
+    # Some servers include the status of other mailboxes in the
+    # response. In all known cases, the requested mailbox is last.
+    # Only its parenthesised status items are needed so the mailbox
+    # names don't have to be parsed.
+    last = data[-1]
+    if isinstance(last, bytes):
+        start = last.rfind(b"(")
+        if start != -1:
+            data = [last[start:]]
+    status_items = parse_response(data)[-1]
+    return dict(as_pairs(status_items))
+
+
 def _quote(arg):
     if isinstance(arg, str):
         arg = arg.replace("\\", "\\\\")
@@ -1823,6 +2424,26 @@ def _quote(arg):
     return q + arg + q
 
 
+def _invalid_criteria_error(error, criteria):
+    """Return an InvalidCriteriaError for a SEARCH error caused by a BAD
+    response, or None for any other error.
+    """
+    # Make BAD IMAP responses easier to understand to the user, with a link to the docs
+    m = re.match(r"SEARCH command error: BAD \[(.+)\]", str(error))
+    if not m:
+        return None
+    return exceptions.InvalidCriteriaError(
+        "{original_msg}\n\n"
+        "This error may have been caused by a syntax error in the criteria: "
+        "{criteria}\nPlease refer to the documentation for more information "
+        "about search criteria syntax..\n"
+        "https://imapclient.readthedocs.io/en/master/#imapclient.IMAPClient.search".format(
+            original_msg=m.group(1),
+            criteria='"%s"' % criteria if not isinstance(criteria, list) else criteria,
+        )
+    )
+
+
 def _normalise_search_criteria(criteria, charset=None):
     if not criteria:
         raise exceptions.InvalidCriteriaError("no criteria specified")
@@ -1890,36 +2511,72 @@ class _quoted(bytes):
 # because imaplib handles flags and sort criteria assuming these are
 # passed as unicode
 def normalise_text_list(items):
-    return list(_normalise_text_list(items))
+    if isinstance(items, (str, bytes)):
+        items = (items,)
+    # A list rather than a generator: str.join() would build one anyway
+    return [to_unicode(c) for c in items]
 
 
 def seq_to_parenstr(items):
-    return _join_and_paren(_normalise_text_list(items))
+    return _join_and_paren(normalise_text_list(items))
 
 
 def seq_to_parenstr_upper(items):
-    return _join_and_paren(item.upper() for item in _normalise_text_list(items))
+    return _join_and_paren([item.upper() for item in normalise_text_list(items)])
 
 
 def _join_and_paren(items):
     return "(" + " ".join(items) + ")"
 
 
-def _normalise_text_list(items):
-    if isinstance(items, (str, bytes)):
-        items = (items,)
-    return (to_unicode(c) for c in items)
-
-
 def join_message_ids(messages):
     """Convert a sequence of messages ids or a single integer message id
     into an id byte string for use with IMAP commands
+
+    Lists and tuples of more than two ints are sent as a compact
+    sequence set: sorted, without duplicates and with runs of
+    consecutive ids collapsed into "lo:hi" ranges. Anything else,
+    including one or two ints, is sent in the order given.
     """
     if isinstance(messages, (str, bytes, int)):
         messages = (to_bytes(messages),)
+    elif isinstance(messages, range):
+        # Contiguous ranges can be sent as a single "lo:hi" sequence set
+        if messages.step == 1 and len(messages) > 1:
+            return b"%d:%d" % (messages.start, messages[-1])
+    elif isinstance(messages, (list, tuple)) and all(type(m) is int for m in messages):
+        # Compressing one or two ids gains nothing
+        if len(messages) > 2:
+            return _compress_message_ids(messages)
+        return ",".join(map(str, messages)).encode("ascii")
     return b",".join(_maybe_int_to_bytes(m) for m in messages)
 
 
+def _compress_message_ids(messages):
+    """Convert integer message ids into a sequence set where runs of
+    consecutive ids are collapsed into "lo:hi" ranges.
+
+    IMAP sequence sets are unordered so the ids are sorted and
+    duplicates dropped.
+    """
+    ids = sorted(set(messages))
+    parts = []
+    start = prev = ids[0]
+    for msgid in ids[1:]:
+        if msgid != prev + 1:
+            parts.append(_format_id_range(start, prev))
+            start = msgid
+        prev = msgid
+    parts.append(_format_id_range(start, prev))
+    return ",".join(parts).encode("ascii")
+
+
+def _format_id_range(start, end):
+    if start == end:
+        return str(start)
+    return "%d:%d" % (start, end)
+
+
 def _maybe_int_to_bytes(val):
     if isinstance(val, int):
         return str(val).encode("us-ascii")
@@ -1931,18 +2588,15 @@ def _parse_untagged_response(text):
     text = text[2:]
     if text.startswith((b"OK ", b"NO ")):
         return tuple(text.split(b" ", 1))
+    match = _RE_SIMPLE_UNTAGGED.match(text)
+    if match:
+        return int(match.group(1)), match.group(2)
     return parse_response([text])
 
 
 def as_pairs(items):
-    i = 0
-    last_item = None
-    for item in items:
-        if i % 2:
-            yield last_item, item
-        else:
-            last_item = item
-        i += 1
+    a = iter(items)
+    return zip(a, a)
 
 
 def as_triplets(items):
@@ -1962,54 +2616,17 @@ def _iter_with_last(items):
 
 _not_present = object()
 
+# Pipeline methods queueing each batch_flags() action
+_FLAG_ACTIONS = {
+    "add": Pipeline.add_flags,
+    "remove": Pipeline.remove_flags,
+    "set": Pipeline.set_flags,
+}
 
-class _dict_bytes_normaliser:
-    """Wrap a dict with unicode/bytes keys and normalise the keys to
-    bytes.
-    """
-
-    def __init__(self, d):
-        self._d = d
-
-    def iteritems(self):
-        for key, value in self._d.items():
-            yield to_bytes(key), value
-
-    # For Python 3 compatibility.
-    items = iteritems
-
-    def __contains__(self, ink):
-        for k in self._gen_keys(ink):
-            if k in self._d:
-                return True
-        return False
-
-    def get(self, ink, default=_not_present):
-        for k in self._gen_keys(ink):
-            try:
-                return self._d[k]
-            except KeyError:
-                pass
-        if default == _not_present:
-            raise KeyError(ink)
-        return default
-
-    def pop(self, ink, default=_not_present):
-        for k in self._gen_keys(ink):
-            try:
-                return self._d.pop(k)
-            except KeyError:
-                pass
-        if default == _not_present:
-            raise KeyError(ink)
-        return default
-
-    def _gen_keys(self, k):
-        yield k
-        if isinstance(k, bytes):
-            yield to_unicode(k)
-        else:
-            yield to_bytes(k)
+# FETCH data items which never change for a message with a given UID
+_IMMUTABLE_FETCH_ITEMS = frozenset(
+    (b"BODYSTRUCTURE", b"ENVELOPE", b"INTERNALDATE", b"RFC822.HEADER", b"RFC822.SIZE")
+)
 
 
 def debug_trunc(v, maxlen):
@@ -2023,6 +2640,12 @@ def utf7_decode_sequence(seq):
     return [decode_utf7(s) for s in seq]
 
 
+def _decode_gm_label_response(response):
+    if not response:
+        return None
+    return {msg: utf7_decode_sequence(labels) for msg, labels in response.items()}
+
+
 def _parse_quota(quota_rep):
     quota_rep = parse_response(quota_rep)
     rv = []
@@ -2039,6 +2662,34 @@ def _parse_quota(quota_rep):
     return rv
 
 
+def _discard_imaplib_log(line):
+    pass
+
+
+class _IMAPlibDebugLevel:
+    """Stand-in for imaplib's integer debug level.
+
+    imaplib formats its debug messages, including the full content of
+    responses, before passing them to _mesg. This behaves as debug
+    level 5 only while *logger* is enabled for DEBUG and 0 otherwise so
+    that most of this work is skipped when nothing would be logged.
+    Each line sent or received is still formatted for imaplib's _log,
+    which IMAPClient replaces with a no-op (see __init__).
+    """
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def __int__(self):
+        return 5 if self._logger.isEnabledFor(DEBUG) else 0
+
+    def __ge__(self, other):
+        return int(self) >= other
+
+    def __lt__(self, other):
+        return int(self) < other
+
+
 class IMAPlibLoggerAdapter(LoggerAdapter):
     """Adapter preventing IMAP secrets from going to the logging facility."""
 
@@ -2048,9 +2699,10 @@ class IMAPlibLoggerAdapter(LoggerAdapter):
         if isinstance(msg, bytes):
             msg = msg.decode("ascii", "ignore")
 
-        for command in ("LOGIN", "AUTHENTICATE"):
-            if msg.startswith(">") and command in msg:
-                msg_start = msg.split(command)[0]
-                msg = "{}{} **REDACTED**".format(msg_start, command)
-                break
+        if msg.startswith(">"):
+            for command in ("LOGIN", "AUTHENTICATE"):
+                if command in msg:
+                    msg_start = msg.split(command)[0]
+                    msg = "{}{} **REDACTED**".format(msg_start, command)
+                    break
         return super().process(msg, kwargs)
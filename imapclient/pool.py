@@ -0,0 +1,221 @@
+# Copyright (c) 2026, Menno Smits
+# Released subject to the New BSD License
+# Please see http://en.wikipedia.org/wiki/BSD_licenses
+
+"""
+A pool of reusable IMAPClient connections.
+
+Establishing a connection (TCP, TLS and authentication) is often much
+slower than the commands that follow. Applications which repeatedly
+perform short pieces of work against the same account can keep
+connections open and reuse them instead.
+"""
+
+import contextlib
+import logging
+import socket
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from . import exceptions
+from .imapclient import IMAPClient
+
+__all__ = ["IMAPClientPool"]
+
+logger = logging.getLogger(__name__)
+
+# Errors which mean a connection is no longer usable
+_CONNECTION_ERRORS = (exceptions.IMAPClientAbortError, socket.error)
+
+
+class IMAPClientPool:
+    """A thread-safe pool of connections to a single IMAP account.
+
+    *factory* is called without arguments whenever a new connection is
+    needed and must return a connected and logged in
+    :py:class:`~imapclient.IMAPClient`. For example::
+
+        def connect():
+            client = IMAPClient("imap.foo.org")
+            client.login("bar@foo.org", "passwd")
+            return client
+
+        pool = IMAPClientPool(connect)
+        with pool.acquire() as client:
+            client.select_folder("INBOX")
+            ...
+
+    At most *max_size* connections are open at once; ``acquire()``
+    blocks until one is released if they are all in use. Connections
+    which have been idle in the pool for more than *check_interval*
+    seconds are checked with a NOOP before being handed out and are
+    replaced if they turn out to be broken. Connections idle for more
+    than *idle_timeout* seconds are logged out.
+
+    A connection is handed back in whatever state it was left by its
+    previous user, in particular with the same folder selected.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], IMAPClient],
+        max_size: int = 2,
+        idle_timeout: float = 300,
+        check_interval: float = 60,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+
+        self._lock = threading.Condition()
+        self._idle: List[Tuple[IMAPClient, float]] = []
+        self._size = 0
+        self._closed = False
+
+    @contextlib.contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[IMAPClient]:
+        """Context manager providing a connection from the pool.
+
+        The connection is returned to the pool when the ``with``
+        block exits. If the block raises an error indicating the
+        connection is unusable, or is interrupted by an exception which
+        isn't an :py:exc:`Exception` (such as
+        :py:exc:`KeyboardInterrupt`), the connection is discarded
+        instead.
+
+        If *timeout* is given, wait at most that many seconds for a
+        connection to become available before raising
+        :py:exc:`TimeoutError`.
+        """
+        client = self._get(timeout)
+        try:
+            yield client
+        except _CONNECTION_ERRORS:
+            self._discard(client)
+            raise
+        except Exception:
+            self._release(client)
+            raise
+        except BaseException:
+            # Eg. KeyboardInterrupt: the connection may have been left
+            # part way through a command so it can't be reused
+            self._discard(client)
+            raise
+        else:
+            self._release(client)
+
+    def close(self) -> None:
+        """Log out of all idle connections and stop handing out new ones.
+
+        Connections in use are logged out when they are released.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for client, _ in idle:
+            _logout(client)
+
+    def __enter__(self) -> "IMAPClientPool":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def _get(self, timeout: Optional[float]) -> IMAPClient:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            expired: List[IMAPClient] = []
+            try:
+                with self._lock:
+                    expired = self._pop_expired()
+                    client, last_used = self._wait_for_connection(deadline)
+            finally:
+                # Log out outside of the lock as this talks to the server
+                for expired_client in expired:
+                    _logout(expired_client)
+            if client is None:
+                return self._connect()
+            if time.monotonic() - last_used <= self.check_interval:
+                return client
+            try:
+                client.noop()  # type: ignore[no-untyped-call]
+            except Exception as e:
+                # Whatever the failure (eg. a connection logged out by its
+                # previous user), the connection can't be handed out
+                logger.info("Discarding broken pooled connection: %s", e)
+                self._discard(client)
+            except BaseException:
+                self._discard(client)
+                raise
+            else:
+                return client
+
+    def _wait_for_connection(
+        self, deadline: Optional[float]
+    ) -> Tuple[Optional[IMAPClient], float]:
+        """Return an idle connection, or (None, 0) if the caller may
+        open a new one. Must be called with the lock held.
+        """
+        while True:
+            if self._closed:
+                raise exceptions.IMAPClientError("pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            if self._size < self.max_size:
+                self._size += 1
+                return None, 0
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("no connection available in the pool")
+            self._lock.wait(remaining)
+
+    def _pop_expired(self) -> List[IMAPClient]:
+        """Remove and return connections idle for longer than
+        idle_timeout. Must be called with the lock held.
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [client for client, last_used in self._idle if last_used < cutoff]
+        if expired:
+            self._idle = [entry for entry in self._idle if entry[1] >= cutoff]
+            self._size -= len(expired)
+        return expired
+
+    def _connect(self) -> IMAPClient:
+        try:
+            return self._factory()
+        except BaseException:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+
+    def _release(self, client: IMAPClient) -> None:
+        with self._lock:
+            if not self._closed:
+                self._idle.append((client, time.monotonic()))
+                self._lock.notify()
+                return
+            self._size -= 1
+        _logout(client)
+
+    def _discard(self, client: IMAPClient) -> None:
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+        try:
+            client.shutdown()
+        except Exception as e:
+            logger.info("Could not close the connection cleanly: %s", e)
+
+
+def _logout(client: IMAPClient) -> None:
+    try:
+        client.logout()  # type: ignore[no-untyped-call]
+    except Exception as e:
+        logger.info("Could not log out cleanly: %s", e)
@@ -64,7 +64,7 @@ def parse_message_list(data: List[Union[bytes, str]]) -> SearchIds:
     if not m:
         raise ValueError("unexpected message list format")
 
-    ids = SearchIds(int(n) for n in m.group(1).split())
+    ids = SearchIds(map(int, m.group(1).split()))
 
     # Parse any non-numeric part on the end using parse_response (this
     # is likely to be the MODSEQ section).
@@ -13,6 +13,8 @@ import socket
 import ssl
 from typing import Optional, TYPE_CHECKING
 
+from .imap4 import GreetingCapabilitiesMixin
+
 if TYPE_CHECKING:
     from typing_extensions import Buffer
 
@@ -26,7 +28,7 @@ def wrap_socket(
     return ssl_context.wrap_socket(sock, server_hostname=host)
 
 
-class IMAP4_TLS(imaplib.IMAP4):
+class IMAP4_TLS(GreetingCapabilitiesMixin):
     """IMAP4 client class for TLS/SSL connections.
 
     Adapted from imaplib.IMAP4_SSL.
@@ -65,6 +65,12 @@ class TestFixedOffset(unittest.TestCase):
         offset = FixedOffset.for_system()
         self.assertEqual(offset.tzname(None), "+1500")
 
+    def test_for_offset_shared(self):
+        offset = FixedOffset.for_offset(90)
+        self.assertEqual(offset.tzname(None), "+0130")
+        self.assertIs(FixedOffset.for_offset(90), offset)
+        self.assertIsNot(FixedOffset.for_offset(-90), offset)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,23 +2,32 @@
 # Released subject to the New BSD License
 # Please see http://en.wikipedia.org/wiki/BSD_licenses
 
-from unittest.mock import Mock
+from unittest.mock import call
 
 from .imapclient_test import IMAPClientTest
 
 
 class TestFolderStatus(IMAPClientTest):
+    def setUp(self):
+        super(TestFolderStatus, self).setUp()
+        imap = self.client._imap
+        imap._command.return_value = "tag"
+        imap._command_complete.return_value = ("OK", [b"done"])
+
+    def set_response(self, data):
+        self.client._imap._untagged_response.return_value = ("OK", data)
+
     def test_basic(self):
-        self.client._imap.status.return_value = (
-            "OK",
-            [b"foo (MESSAGES 3 RECENT 0 UIDNEXT 4 UIDVALIDITY 1435636895 UNSEEN 0)"],
+        self.set_response(
+            [b"foo (MESSAGES 3 RECENT 0 UIDNEXT 4 UIDVALIDITY 1435636895 UNSEEN 0)"]
         )
 
         out = self.client.folder_status("foo")
 
-        self.client._imap.status.assert_called_once_with(
-            b'"foo"', "(MESSAGES RECENT UIDNEXT UIDVALIDITY UNSEEN)"
+        self.client._imap._command.assert_called_once_with(
+            "STATUS", b'"foo"', "(MESSAGES RECENT UIDNEXT UIDVALIDITY UNSEEN)"
         )
+        self.client._imap._command_complete.assert_called_once_with("STATUS", "tag")
         self.assertDictEqual(
             out,
             {
@@ -31,31 +40,56 @@ class TestFolderStatus(IMAPClientTest):
         )
 
     def test_literal(self):
-        self.client._imap.status.return_value = (
-            "OK",
-            [(b"{3}", b"foo"), b" (UIDNEXT 4)"],
-        )
+        self.set_response([(b"{3}", b"foo"), b" (UIDNEXT 4)"])
 
         out = self.client.folder_status("foo", ["UIDNEXT"])
 
-        self.client._imap.status.assert_called_once_with(b'"foo"', "(UIDNEXT)")
+        self.client._imap._command.assert_called_once_with(
+            "STATUS", b'"foo"', "(UIDNEXT)"
+        )
         self.assertDictEqual(out, {b"UIDNEXT": 4})
 
     def test_extra_response(self):
         # In production, we've seen folder names containing spaces come back
         # like this and be broken into two components in the tuple.
-        server_response = [b"My files (UIDNEXT 24369)"]
-        mock = Mock(return_value=server_response)
-        self.client._command_and_check = mock
+        self.set_response([b"My files (UIDNEXT 24369)"])
 
         resp = self.client.folder_status("My files", ["UIDNEXT"])
         self.assertEqual(resp, {b"UIDNEXT": 24369})
 
         # We've also seen the response contain mailboxes we didn't
         # ask for. In all known cases, the desired mailbox is last.
-        server_response = [b"sent (UIDNEXT 123)\nINBOX (UIDNEXT 24369)"]
-        mock = Mock(return_value=server_response)
-        self.client._command_and_check = mock
+        self.set_response([b"sent (UIDNEXT 123)\nINBOX (UIDNEXT 24369)"])
 
         resp = self.client.folder_status("INBOX", ["UIDNEXT"])
         self.assertEqual(resp, {b"UIDNEXT": 24369})
+
+    def test_parens_in_folder_name(self):
+        self.set_response([b'"foo (bar)" (UIDNEXT 4)'])
+
+        out = self.client.folder_status("foo (bar)", ["UIDNEXT"])
+
+        self.assertDictEqual(out, {b"UIDNEXT": 4})
+
+    def test_folder_statuses(self):
+        imap = self.client._imap
+        imap._command.side_effect = ["tag1", "tag2"]
+        imap._untagged_response.side_effect = [
+            ("OK", [b"foo (UIDNEXT 4)"]),
+            ("OK", [b"bar (UIDNEXT 9)"]),
+        ]
+
+        out = self.client.folder_statuses(iter(["foo", "bar"]), ["UIDNEXT"])
+
+        self.assertEqual(
+            imap._command.call_args_list,
+            [
+                call("STATUS", b'"foo"', "(UIDNEXT)"),
+                call("STATUS", b'"bar"', "(UIDNEXT)"),
+            ],
+        )
+        self.assertEqual(
+            imap._command_complete.call_args_list,
+            [call("STATUS", "tag1"), call("STATUS", "tag2")],
+        )
+        self.assertDictEqual(out, {"foo": {b"UIDNEXT": 4}, "bar": {b"UIDNEXT": 9}})
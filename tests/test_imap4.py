@@ -0,0 +1,34 @@
+# Copyright (c) 2026, Menno Smits
+# Released subject to the New BSD License
+# Please see http://en.wikipedia.org/wiki/BSD_licenses
+
+import imaplib
+import unittest
+from unittest.mock import patch
+
+from imapclient.imap4 import IMAP4WithTimeout
+
+
+class TestGreetingCapabilities(unittest.TestCase):
+    def setUp(self):
+        # Avoid connecting: only the capability handling is under test
+        self.imap = IMAP4WithTimeout.__new__(IMAP4WithTimeout)
+        self.imap._encoding = "ascii"
+
+    @patch.object(imaplib.IMAP4, "_get_capabilities")
+    def test_from_greeting(self, get_capabilities):
+        self.imap.untagged_responses = {"CAPABILITY": [b"IMAP4rev1 IDLE"]}
+
+        self.imap._get_capabilities()
+
+        self.assertEqual(self.imap.capabilities, ("IMAP4REV1", "IDLE"))
+        self.assertEqual(self.imap.untagged_responses, {})
+        self.assertFalse(get_capabilities.called)
+
+    @patch.object(imaplib.IMAP4, "_get_capabilities")
+    def test_not_in_greeting(self, get_capabilities):
+        self.imap.untagged_responses = {"OK": [b"ready"]}
+
+        self.imap._get_capabilities()
+
+        get_capabilities.assert_called_once_with()
@@ -48,3 +48,10 @@ class IMAP4UTF7TestCase(unittest.TestCase):
         self.assertEqual(encode("&"), b"&-")
         self.assertEqual(encode("&"), b"&-")
         self.assertEqual(decode(b"&-"), "&")
+
+    def test_decode_unterminated_shift(self):
+        self.assertEqual(decode(b"Hello&AP8"), "Hello\xff")
+
+    def test_encode_ascii_control_characters(self):
+        # Not printable so these must still be base64 encoded
+        self.assertEqual(encode("foo\x7f"), b"foo&AH8-")
@@ -2,21 +2,30 @@
 # Released subject to the New BSD License
 # Please see http://en.wikipedia.org/wiki/BSD_licenses
 
+import asyncio
+import inspect
 import io
 import itertools
 import logging
 import socket
 import sys
+import threading
+import unittest
 import warnings
 from datetime import datetime
 from select import POLLIN
-from unittest.mock import Mock, patch, sentinel
+from unittest.mock import call, Mock, patch, sentinel
 
-from imapclient.exceptions import CapabilityError, IMAPClientError, ProtocolError
+from imapclient.exceptions import (
+    CapabilityError,
+    IMAPClientAbortError,
+    IMAPClientError,
+    ProtocolError,
+)
 from imapclient.fixed_offset import FixedOffset
+from imapclient.imapclient import _literal, _parse_quota, _parse_untagged_response
+from imapclient.imapclient import IMAPClient as RealIMAPClient
 from imapclient.imapclient import (
-    _literal,
-    _parse_quota,
     IMAPlibLoggerAdapter,
     MailboxQuotaRoots,
     Quota,
@@ -46,6 +55,24 @@ class TestListFolders(IMAPClientTest):
         )
         self.assertTrue(folders is sentinel.folder_list)
 
+    def test_folder_exists(self):
+        self.client._imap._simple_command.return_value = ("OK", [b"something"])
+        self.client._imap._untagged_response.return_value = (
+            "LIST",
+            [b'(\\HasNoChildren) "/" "foo"'],
+        )
+
+        self.assertTrue(self.client.folder_exists("foo"))
+        self.client._imap._simple_command.assert_called_once_with(
+            "LIST", b'""', b'"foo"'
+        )
+
+    def test_folder_not_exists(self):
+        self.client._imap._simple_command.return_value = ("OK", [b"something"])
+        self.client._imap._untagged_response.return_value = ("LIST", [None])
+
+        self.assertFalse(self.client.folder_exists("foo"))
+
     def test_list_sub_folders(self):
         self.client._imap._simple_command.return_value = ("OK", [b"something"])
         self.client._imap._untagged_response.return_value = (
@@ -119,6 +146,15 @@ class TestListFolders(IMAPClientTest):
             ],
         )
 
+    def test_normalise_folder_honours_folder_encode(self):
+        self.assertEqual(
+            self.client._normalise_folder("Hello\xffworld"), b'"Hello&AP8-world"'
+        )
+        self.client.folder_encode = False
+        self.assertEqual(
+            self.client._normalise_folder("Hello\xffworld"), '"Hello\xffworld"'
+        )
+
     def test_simple(self):
         folders = self.client._proc_folder_list(
             [
@@ -349,6 +385,12 @@ class TestAppend(IMAPClientTest):
             b'"foobar"', "(FLAG WAVE)", None, b"hi"
         )
 
+    def test_bytes_like_msg_not_copied(self):
+        self.client._imap.append.return_value = ("OK", [b"Good"])
+        for msg in (b"hi", bytearray(b"hi"), memoryview(b"hi")):
+            self.client.append("foobar", msg)
+            self.assertIs(self.client._imap.append.call_args[0][3], msg)
+
     @patch("imapclient.imapclient.datetime_to_INTERNALDATE")
     def test_with_msg_time(self, datetime_to_INTERNALDATE):
         datetime_to_INTERNALDATE.return_value = "somedate"
@@ -548,6 +590,45 @@ class TestIdleAndNoop(IMAPClientTest):
             ],
         )
 
+    def test_idle_wait(self):
+        local, remote = socket.socketpair()
+        self.addCleanup(local.close)
+        self.addCleanup(remote.close)
+        self.client._imap.sock = self.client._imap.sslobj = local
+        self.client.idle_check = Mock(return_value=[(1, b"EXISTS")])
+
+        async def wait():
+            waiter = asyncio.ensure_future(self.client.idle_wait())
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())
+            remote.send(b"* 1 EXISTS\r\n")
+            return await waiter
+
+        self.assertEqual(asyncio.run(wait()), [(1, b"EXISTS")])
+        self.client.idle_check.assert_called_once_with(timeout=0)
+
+    def test_idle_wait_timeout(self):
+        local, remote = socket.socketpair()
+        self.addCleanup(local.close)
+        self.addCleanup(remote.close)
+        self.client._imap.sock = self.client._imap.sslobj = local
+        self.client.idle_check = Mock()
+
+        responses = asyncio.run(self.client.idle_wait(timeout=0.01))
+
+        self.assertEqual(responses, [])
+        self.assertFalse(self.client.idle_check.called)
+
+    def test_idle_wait_is_coroutine_function(self):
+        self.assertTrue(inspect.iscoroutinefunction(IMAPClient.idle_wait))
+
+    def test_idle_wait_capability_checked_when_awaited(self):
+        self.client._cached_capabilities = (b"IMAP4REV1",)
+
+        coro = self.client.idle_wait()
+        with self.assertRaises(CapabilityError):
+            asyncio.run(coro)
+
     def test_idle(self):
         self.client._imap._command.return_value = sentinel.tag
         self.client._imap._get_response.return_value = None
@@ -664,6 +745,28 @@ class TestIdleAndNoop(IMAPClientTest):
         self.assert_sock_poll_calls(mock_sock)
         self.assertListEqual([], responses)
 
+    @patch("imapclient.imapclient.POLL_SUPPORT", True)
+    @patch("imapclient.imapclient.select.poll")
+    def test_idle_check_reuses_poller(self, mock_poll_module):
+        mock_sock = Mock(fileno=Mock(return_value=1))
+        self.client._imap.sock = self.client._imap.sslobj = mock_sock
+
+        mock_poller = Mock(poll=Mock(return_value=[]))
+        mock_poll_module.return_value = mock_poller
+
+        self.client.idle_check(timeout=0.5)
+        self.client.idle_check(timeout=0.5)
+
+        assert mock_poll_module.call_count == 1
+        mock_poller.register.assert_called_once_with(1, POLLIN)
+        self.assertEqual(mock_poller.poll.call_count, 2)
+
+        # A different socket gets a new poller
+        mock_sock.fileno.return_value = 2
+        self.client.idle_check(timeout=0.5)
+        assert mock_poll_module.call_count == 2
+        mock_poller.register.assert_called_with(2, POLLIN)
+
     @patch("imapclient.imapclient.POLL_SUPPORT", True)
     @patch("imapclient.imapclient.select.poll")
     def test_idle_check_with_data_poll(self, mock_poll_module):
@@ -737,6 +840,51 @@ class TestIdleAndNoop(IMAPClientTest):
         self.assertListEqual([(99, b"EXISTS")], responses)
 
 
+class TestWatchFolder(IMAPClientTest):
+    def test_idle(self):
+        self.client._cached_capabilities = (b"IDLE",)
+        self.client.select_folder = Mock()
+        self.client.idle = Mock()
+        self.client.idle_check = Mock(side_effect=[[], [(1, b"EXISTS")]])
+        self.client.idle_done = Mock(
+            side_effect=[(b"done", []), (b"done", [(2, b"EXISTS")])]
+        )
+        callback = Mock(return_value=False)
+
+        self.client.watch_folder("INBOX", callback, idle_timeout=10)
+
+        self.client.select_folder.assert_called_once_with("INBOX", readonly=True)
+        self.assertEqual(self.client.idle.call_count, 2)
+        self.client.idle_check.assert_called_with(timeout=10)
+        callback.assert_called_once_with([(1, b"EXISTS"), (2, b"EXISTS")])
+
+    @patch("imapclient.imapclient.time.sleep")
+    def test_poll(self, mock_sleep):
+        self.client._cached_capabilities = (b"IMAP4REV1",)
+        self.client.folder_status = Mock(
+            side_effect=[
+                {b"MESSAGES": 3, b"UIDNEXT": 10},
+                {b"MESSAGES": 3, b"UIDNEXT": 10},
+                {b"MESSAGES": 4, b"UIDNEXT": 11},
+                {b"MESSAGES": 3, b"UIDNEXT": 11},
+            ]
+        )
+        callback = Mock(side_effect=[None, False])
+
+        self.client.watch_folder("INBOX", callback, poll_interval=5)
+
+        self.client.folder_status.assert_called_with("INBOX", ("MESSAGES", "UIDNEXT"))
+        mock_sleep.assert_called_with(5)
+        self.assertEqual(mock_sleep.call_count, 3)
+        self.assertEqual(
+            callback.call_args_list,
+            [
+                (({b"MESSAGES": 4, b"UIDNEXT": 11},), {}),
+                (({b"MESSAGES": 3},), {}),
+            ],
+        )
+
+
 class TestDebugLogging(IMAPClientTest):
     def test_IMAP_is_patched(self):
         # Remove all logging handlers so that the order of tests does not
@@ -749,6 +897,48 @@ class TestDebugLogging(IMAPClientTest):
         self.client._imap._mesg("two")
         self.assertIn("DEBUG:imapclient.imaplib:two", log_stream.getvalue())
 
+    def test_imaplib_debug_level_follows_logger(self):
+        logger = logging.getLogger("imapclient.imaplib")
+        self.addCleanup(logger.setLevel, logger.level)
+
+        logger.setLevel(logging.DEBUG)
+        self.assertTrue(self.client._imap.debug >= 5)
+
+        logger.setLevel(logging.INFO)
+        self.assertFalse(self.client._imap.debug >= 1)
+        self.assertTrue(self.client._imap.debug < 1)
+
+    def test_password_not_kept_in_imaplib_cmd_log(self):
+        logger = logging.getLogger("imapclient.imaplib")
+        self.addCleanup(logger.setLevel, logger.level)
+        logger.setLevel(logging.INFO)
+
+        listener = socket.socket()
+        self.addCleanup(listener.close)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+
+        def serve():
+            conn, _ = listener.accept()
+            with conn, conn.makefile("rb") as f:
+                conn.sendall(b"* OK [CAPABILITY IMAP4rev1] ready\r\n")
+                tag = f.readline().split()[0]
+                conn.sendall(tag + b" OK logged in\r\n")
+                f.readline()
+
+        server = threading.Thread(target=serve)
+        server.start()
+        self.addCleanup(server.join, 5)
+
+        client = RealIMAPClient(
+            "127.0.0.1", port=listener.getsockname()[1], ssl=False, timeout=5
+        )
+        self.addCleanup(client.shutdown)
+        client.login("foo@bar.org", "secret")
+
+        logged = [line for line, _ in client._imap._cmd_log.values()]
+        self.assertFalse([line for line in logged if "secret" in line])
+
     def test_redacted_password(self):
         logger_mock = Mock()
         logger_mock.manager.disable = logging.DEBUG
@@ -791,6 +981,184 @@ class TestTimeNormalisation(IMAPClientTest):
         check(False)
 
 
+class TestFetchIter(IMAPClientTest):
+    def test_yields_as_responses_arrive(self):
+        imap = self.client._imap
+        imap._command.return_value = "tag1"
+        imap.tagged_commands = {"tag1": None}
+        imap.untagged_responses = {}
+        imap._command_complete.return_value = ("OK", [b"done"])
+        responses = [
+            [b"1 (UID 11 FLAGS (foo))"],
+            [(b"2 (UID 22 RFC822 {3}", b"abc"), b")"],
+            None,
+        ]
+
+        def get_response():
+            response = responses.pop(0)
+            if response is None:
+                imap.tagged_commands["tag1"] = ("OK", [b"done"])
+            else:
+                imap.untagged_responses["FETCH"] = response
+
+        imap._get_response.side_effect = get_response
+
+        it = self.client.fetch_iter([11, 22], ["FLAGS", "RFC822"])
+        self.assertEqual(next(it), (11, {b"SEQ": 1, b"FLAGS": (b"foo",)}))
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(next(it), (22, {b"SEQ": 2, b"RFC822": b"abc"}))
+        self.assertEqual(list(it), [])
+
+        imap._command.assert_called_once_with(
+            "UID", "FETCH", b"11,22", "(FLAGS RFC822)", None
+        )
+        imap._command_complete.assert_called_once_with("FETCH", "tag1")
+
+    def test_no_messages(self):
+        self.assertEqual(list(self.client.fetch_iter([], ["FLAGS"])), [])
+        self.assertFalse(self.client._imap._command.called)
+
+
+class TestFetchCache(IMAPClientTest):
+    def setUp(self):
+        super(TestFetchCache, self).setUp()
+        self.client.fetch_cache = {}
+        self.client._fetch_cache_scope = ("host", "user", b"INBOX", 123)
+        imap = self.client._imap
+        imap._command.return_value = "tag1"
+        imap._command_complete.return_value = ("OK", [b"done"])
+
+    def set_fetch_responses(self, *responses):
+        self.client._imap._untagged_response.side_effect = [
+            ("OK", response) for response in responses
+        ]
+
+    def test_repeat_fetch_uses_cache(self):
+        self.set_fetch_responses([b"1 (UID 11 RFC822.SIZE 100)"])
+
+        first = self.client.fetch([11], ["RFC822.SIZE"])
+        second = self.client.fetch([11], ["RFC822.SIZE"])
+
+        self.assertEqual(first, {11: {b"SEQ": 1, b"RFC822.SIZE": 100}})
+        self.assertEqual(second, {11: {b"RFC822.SIZE": 100}})
+        self.client._imap._command.assert_called_once_with(
+            "UID", "FETCH", b"11", "(RFC822.SIZE)", None
+        )
+
+    def test_only_misses_fetched(self):
+        self.client.fetch_cache[("host", "user", b"INBOX", 123, 11, b"RFC822.SIZE")] = (
+            100
+        )
+        self.set_fetch_responses([b"2 (UID 22 RFC822.SIZE 200)"])
+
+        result = self.client.fetch([11, 22], ["RFC822.SIZE"])
+
+        self.assertEqual(
+            result,
+            {11: {b"RFC822.SIZE": 100}, 22: {b"SEQ": 2, b"RFC822.SIZE": 200}},
+        )
+        self.client._imap._command.assert_called_once_with(
+            "UID", "FETCH", b"22", "(RFC822.SIZE)", None
+        )
+        self.assertEqual(
+            self.client.fetch_cache[
+                ("host", "user", b"INBOX", 123, 22, b"RFC822.SIZE")
+            ],
+            200,
+        )
+
+    def test_mutable_items_fetched_for_hits(self):
+        self.client.fetch_cache[("host", "user", b"INBOX", 123, 11, b"RFC822.SIZE")] = (
+            100
+        )
+        # 33 doesn't exist
+        self.set_fetch_responses([None], [b"1 (UID 11 FLAGS (foo))"])
+
+        result = self.client.fetch([11, 33], ["RFC822.SIZE", "FLAGS"])
+
+        self.assertEqual(
+            result, {11: {b"SEQ": 1, b"FLAGS": (b"foo",), b"RFC822.SIZE": 100}}
+        )
+        self.assertEqual(
+            self.client._imap._command.call_args_list,
+            [
+                call("UID", "FETCH", b"33", "(RFC822.SIZE FLAGS)", None),
+                call("UID", "FETCH", b"11", "(FLAGS)", None),
+            ],
+        )
+
+    def test_message_ranges_populate_cache(self):
+        self.set_fetch_responses([b"1 (UID 11 RFC822.SIZE 100)"])
+
+        self.client.fetch("1:*", ["RFC822.SIZE"])
+
+        self.assertEqual(
+            self.client.fetch_cache,
+            {("host", "user", b"INBOX", 123, 11, b"RFC822.SIZE"): 100},
+        )
+
+    def test_not_used_without_uidvalidity(self):
+        self.client._fetch_cache_scope = None
+        self.set_fetch_responses(
+            [b"1 (UID 11 RFC822.SIZE 100)"], [b"1 (UID 11 RFC822.SIZE 100)"]
+        )
+
+        self.client.fetch([11], ["RFC822.SIZE"])
+        self.client.fetch([11], ["RFC822.SIZE"])
+
+        self.assertEqual(self.client._imap._command.call_count, 2)
+        self.assertEqual(self.client.fetch_cache, {})
+
+    def test_scope_follows_selected_folder(self):
+        self.client._command_and_check = Mock()
+        self.client._imap.untagged_responses = {b"UIDVALIDITY": [b"42"]}
+        self.client.login("bar", "passwd")
+
+        self.client.select_folder("Sent")
+        self.assertEqual(
+            self.client._fetch_cache_scope, ("somehost", "bar", b'"Sent"', 42)
+        )
+
+        self.client.close_folder()
+        self.assertIsNone(self.client._fetch_cache_scope)
+
+    def test_not_scoped_without_known_account(self):
+        self.client._command_and_check = Mock()
+        self.client._imap.untagged_responses = {b"UIDVALIDITY": [b"42"]}
+
+        self.client.select_folder("INBOX")
+
+        self.assertIsNone(self.client._fetch_cache_scope)
+
+    def test_shared_cache_separates_accounts(self):
+        cache = {}
+        responses = {
+            "alice": [b"1 (UID 11 RFC822.SIZE 100)"],
+            "bob": [b"1 (UID 11 RFC822.SIZE 200)"],
+        }
+        out = {}
+        for user in ("alice", "bob"):
+            client = IMAPClient()
+            client.fetch_cache = cache
+            client._command_and_check = Mock()
+            client.login(user, "passwd")
+            client._imap.untagged_responses = {"UIDVALIDITY": [b"1700000000"]}
+            client.select_folder("INBOX")
+            imap = client._imap
+            imap._command.return_value = "tag1"
+            imap._command_complete.return_value = ("OK", [b"done"])
+            imap._untagged_response.return_value = ("OK", responses[user])
+
+            out[user] = client.fetch([11], ["RFC822.SIZE"])
+            imap._command.assert_called_once_with(
+                "UID", "FETCH", b"11", "(RFC822.SIZE)", None
+            )
+
+        self.assertEqual(out["alice"][11][b"RFC822.SIZE"], 100)
+        self.assertEqual(out["bob"][11][b"RFC822.SIZE"], 200)
+        self.assertEqual(len(cache), 2)
+
+
 class TestNamespace(IMAPClientTest):
     def setUp(self):
         super(TestNamespace, self).setUp()
@@ -839,6 +1207,22 @@ class TestCapabilities(IMAPClientTest):
 
         self.assertEqual(self.client.capabilities(), (b"FOO", b"BAR"))
 
+    def test_preauth_reused_while_unchanged(self):
+        self.client._imap.capabilities = ("FOO", "BAR")
+        self.client._imap.untagged_responses = {}
+
+        first = self.client.capabilities()
+        self.assertTrue(self.client.has_capability("FOO"))
+        capability_set = self.client._capability_set
+        self.assertTrue(self.client.has_capability("BAR"))
+
+        self.assertIs(self.client.capabilities(), first)
+        self.assertIs(self.client._capability_set, capability_set)
+
+        self.client._imap.capabilities = ("BAZ",)
+        self.assertEqual(self.client.capabilities(), (b"BAZ",))
+        self.assertFalse(self.client.has_capability("FOO"))
+
     def test_server_returned_capability_after_auth(self):
         self.client._imap.capabilities = (b"FOO",)
         self.client._imap.untagged_responses = {"CAPABILITY": [b"FOO MORE"]}
@@ -848,6 +1232,13 @@ class TestCapabilities(IMAPClientTest):
         self.assertEqual(self.client._cached_capabilities, (b"FOO", b"MORE"))
         self.assertEqual(self.client._imap.untagged_responses, {})
 
+    def test_server_returned_capability_bytes_key(self):
+        self.client._imap.capabilities = (b"FOO",)
+        self.client._imap.untagged_responses = {b"CAPABILITY": [b"FOO MORE"]}
+
+        self.assertEqual(self.client.capabilities(), (b"FOO", b"MORE"))
+        self.assertEqual(self.client._imap.untagged_responses, {})
+
     def test_caching(self):
         self.client._imap.capabilities = ("FOO",)
         self.client._imap.untagged_responses = {}
@@ -892,6 +1283,13 @@ class TestCapabilities(IMAPClientTest):
         self.assertTrue(self.client.has_capability("foo"))
         self.assertFalse(self.client.has_capability("BAR"))
 
+    def test_has_capability_follows_capability_changes(self):
+        self.client._cached_capabilities = (b"FOO",)
+        self.assertFalse(self.client.has_capability("BAR"))
+
+        self.client._cached_capabilities = (b"FOO", b"BAR")
+        self.assertTrue(self.client.has_capability("BAR"))
+
     def test_decorator(self):
         class Foo(object):
             def has_capability(self, capability):
@@ -961,6 +1359,11 @@ class TestRawCommand(IMAPClientTest):
             b"tag UID SEARCH ALL\r\n",
         )
 
+    def test_plain_sent_in_one_write(self):
+        with patch.object(self.client._imap, "send") as send:
+            self.client._raw_command(b"search", [b"ALL"])
+        send.assert_called_once_with(b"tag UID SEARCH ALL\r\n")
+
     def test_not_uid(self):
         self.client.use_uid = False
         self.check(
@@ -1094,6 +1497,128 @@ class TestContextManager(IMAPClientTest):
                 raise ValueError("Error raised inside the context manager")
 
 
+class TestPipeline(IMAPClientTest):
+    def setUp(self):
+        super(TestPipeline, self).setUp()
+        imap = self.client._imap
+        imap._command.side_effect = ["tag1", "tag2", "tag3"]
+        imap._command_complete.return_value = ("OK", [b"done"])
+
+    def test_commands_sent_before_responses_read(self):
+        imap = self.client._imap
+        imap._untagged_response.side_effect = [
+            ("OK", [b"11 (FLAGS (\\Seen) UID 1)"]),
+            ("OK", [b"12 (FLAGS (foo) UID 2)"]),
+        ]
+        manager = Mock()
+        manager.attach_mock(imap._command, "command")
+        manager.attach_mock(imap._command_complete, "command_complete")
+
+        with self.client.pipeline() as p:
+            p.add_flags([1], [b"\\Seen"])
+            p.fetch([2], ["FLAGS"])
+
+        self.assertEqual(
+            [name for name, _, _ in manager.mock_calls],
+            ["command", "command", "command_complete", "command_complete"],
+        )
+        imap._command.assert_any_call("UID", "STORE", b"1", b"+FLAGS", "(\\Seen)")
+        imap._command.assert_any_call("UID", "FETCH", b"2", "(FLAGS)", None)
+        imap._command_complete.assert_any_call("STORE", "tag1")
+        imap._command_complete.assert_any_call("FETCH", "tag2")
+        self.assertEqual(
+            p.results,
+            [
+                {1: (b"\\Seen",)},
+                {2: {b"SEQ": 12, b"FLAGS": (b"foo",)}},
+            ],
+        )
+
+    def test_silent_and_empty(self):
+        self.client._imap._untagged_response.return_value = ("OK", [None])
+
+        with self.client.pipeline() as p:
+            p.set_flags([1, 2], [b"foo"], silent=True)
+            p.remove_flags([], [b"foo"])
+
+        self.client._imap._command.assert_called_once_with(
+            "UID", "STORE", b"1,2", b"FLAGS.SILENT", "(foo)"
+        )
+        self.assertEqual(p.results, [None, {}])
+
+    def test_gmail_labels(self):
+        self.client._imap._untagged_response.return_value = (
+            "OK",
+            [b'11 (X-GM-LABELS (&AUE-abel "foo") UID 1)'],
+        )
+
+        with self.client.pipeline() as p:
+            p.add_gmail_labels([1], ["foo"])
+            p.remove_gmail_labels([], ["foo"])
+
+        self.client._imap._command.assert_called_once_with(
+            "UID", "STORE", b"1", b"+X-GM-LABELS", '("foo")'
+        )
+        self.assertEqual(p.results, [{1: ["\u0141abel", "foo"]}, None])
+
+    def test_error_raised_after_all_responses_read(self):
+        imap = self.client._imap
+        imap._command_complete.side_effect = [
+            ("NO", [b"bad"]),
+            ("OK", [b"done"]),
+        ]
+        imap._untagged_response.return_value = ("OK", [None])
+
+        with self.assertRaises(IMAPClientError):
+            with self.client.pipeline() as p:
+                p.delete_messages([1])
+                p.delete_messages([2])
+
+        self.assertEqual(imap._command_complete.call_count, 2)
+        self.assertIsNone(p.results)
+
+    def test_abort_does_not_hide_error_in_block(self):
+        imap = self.client._imap
+        imap._command_complete.side_effect = IMAPClientAbortError("gone")
+
+        with self.assertRaises(ValueError):
+            with self.client.pipeline() as p:
+                p.delete_messages([1])
+                raise ValueError()
+
+    def test_abort_raised(self):
+        imap = self.client._imap
+        imap._command_complete.side_effect = IMAPClientAbortError("gone")
+
+        with self.assertRaises(IMAPClientAbortError):
+            with self.client.pipeline() as p:
+                p.delete_messages([1])
+
+
+class TestParseUntaggedResponse(unittest.TestCase):
+    def test_simple(self):
+        self.assertEqual(_parse_untagged_response(b"* 12 EXISTS"), (12, b"EXISTS"))
+        self.assertEqual(_parse_untagged_response(b"* 0 RECENT"), (0, b"RECENT"))
+
+    def test_status(self):
+        self.assertEqual(
+            _parse_untagged_response(b"* OK Still here"), (b"OK", b"Still here")
+        )
+
+    def test_leading_zero_not_converted(self):
+        self.assertEqual(_parse_untagged_response(b"* 01 EXISTS"), (b"01", b"EXISTS"))
+
+    def test_fetch(self):
+        self.assertEqual(
+            _parse_untagged_response(b"* 3 FETCH (FLAGS (\\Seen))"),
+            (3, b"FETCH", (b"FLAGS", (b"\\Seen",))),
+        )
+
+    def test_not_untagged(self):
+        with self.assertRaises(ProtocolError):
+            _parse_untagged_response(b"A001 OK done")
+
+
 class TestProtocolError(IMAPClientTest):
     def test_tagged_response_with_parse_error(self):
         client = self.client
@@ -0,0 +1,192 @@
+# Copyright (c) 2026, Menno Smits
+# Released subject to the New BSD License
+# Please see http://en.wikipedia.org/wiki/BSD_licenses
+
+import socket
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from imapclient.exceptions import IMAPClientError
+from imapclient.pool import IMAPClientPool
+
+
+class TestIMAPClientPool(unittest.TestCase):
+    def setUp(self):
+        self.factory = Mock(side_effect=lambda: Mock())
+        self.pool = IMAPClientPool(self.factory, max_size=2)
+
+    def test_connection_reused(self):
+        with self.pool.acquire() as first:
+            pass
+        with self.pool.acquire() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(self.factory.call_count, 1)
+        self.assertFalse(first.noop.called)
+
+    def test_connections_in_use_not_shared(self):
+        with self.pool.acquire() as first:
+            with self.pool.acquire() as second:
+                self.assertIsNot(first, second)
+        self.assertEqual(self.factory.call_count, 2)
+
+    def test_max_size(self):
+        with self.pool.acquire():
+            with self.pool.acquire():
+                with self.assertRaises(TimeoutError):
+                    with self.pool.acquire(timeout=0.01):
+                        pass
+
+    def test_waits_for_release(self):
+        pool = IMAPClientPool(self.factory, max_size=1)
+        acquired = []
+
+        with pool.acquire() as first:
+            thread = threading.Thread(
+                target=lambda: acquired.append(pool.acquire(timeout=5).__enter__())
+            )
+            thread.start()
+            thread.join(0.05)
+            self.assertEqual(acquired, [])
+        thread.join(5)
+
+        self.assertEqual(acquired, [first])
+
+    @patch("imapclient.pool.time.monotonic")
+    def test_idle_connection_checked(self, monotonic):
+        monotonic.return_value = 100
+        with self.pool.acquire() as first:
+            pass
+
+        monotonic.return_value = 100 + self.pool.check_interval + 1
+        with self.pool.acquire() as second:
+            pass
+
+        self.assertIs(first, second)
+        first.noop.assert_called_once_with()
+
+    @patch("imapclient.pool.time.monotonic")
+    def test_broken_idle_connection_replaced(self, monotonic):
+        monotonic.return_value = 100
+        with self.pool.acquire() as first:
+            first.noop.side_effect = socket.error("gone")
+
+        monotonic.return_value = 100 + self.pool.check_interval + 1
+        with self.pool.acquire() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.shutdown.assert_called_once_with()
+        self.assertEqual(self.factory.call_count, 2)
+
+    @patch("imapclient.pool.time.monotonic")
+    def test_idle_connection_in_wrong_state_replaced(self, monotonic):
+        pool = IMAPClientPool(self.factory, max_size=1)
+        monotonic.return_value = 100
+        with pool.acquire() as first:
+            first.noop.side_effect = IMAPClientError(
+                "command NOOP illegal in state LOGOUT"
+            )
+
+        monotonic.return_value = 100 + pool.check_interval + 1
+        with pool.acquire(timeout=0.01) as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.shutdown.assert_called_once_with()
+
+    @patch("imapclient.pool.time.monotonic")
+    def test_interrupted_check_frees_slot(self, monotonic):
+        pool = IMAPClientPool(self.factory, max_size=1)
+        monotonic.return_value = 100
+        with pool.acquire() as first:
+            first.noop.side_effect = KeyboardInterrupt()
+
+        monotonic.return_value = 100 + pool.check_interval + 1
+        with self.assertRaises(KeyboardInterrupt):
+            with pool.acquire():
+                pass
+        with pool.acquire(timeout=0.01) as second:
+            pass
+
+        self.assertIsNot(first, second)
+
+    @patch("imapclient.pool.time.monotonic")
+    def test_expired_connection_logged_out(self, monotonic):
+        monotonic.return_value = 100
+        with self.pool.acquire() as first:
+            pass
+
+        monotonic.return_value = 100 + self.pool.idle_timeout + 1
+        with self.pool.acquire() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.logout.assert_called_once_with()
+
+    def test_connection_discarded_after_connection_error(self):
+        with self.assertRaises(socket.error):
+            with self.pool.acquire() as first:
+                raise socket.error("gone")
+        with self.pool.acquire() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.shutdown.assert_called_once_with()
+
+    def test_connection_kept_after_other_error(self):
+        with self.assertRaises(ValueError):
+            with self.pool.acquire() as first:
+                raise ValueError()
+        with self.pool.acquire() as second:
+            pass
+
+        self.assertIs(first, second)
+
+    def test_connection_discarded_after_interrupt(self):
+        with self.assertRaises(KeyboardInterrupt):
+            with self.pool.acquire() as first:
+                raise KeyboardInterrupt()
+        with self.pool.acquire() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.shutdown.assert_called_once_with()
+
+    def test_connection_discarded_when_generator_closed(self):
+        def borrow():
+            with self.pool.acquire() as client:
+                yield client
+
+        gen = borrow()
+        first = next(gen)
+        gen.close()
+
+        first.shutdown.assert_called_once_with()
+        self.assertEqual(self.pool._size, 0)
+
+    def test_factory_error_frees_slot(self):
+        pool = IMAPClientPool(Mock(side_effect=socket.error("refused")), max_size=1)
+        for _ in range(2):
+            with self.assertRaises(socket.error):
+                with pool.acquire(timeout=0.01):
+                    pass
+
+    def test_close(self):
+        with self.pool.acquire() as in_use:
+            with self.pool.acquire() as idle:
+                pass
+            self.pool.close()
+            idle.logout.assert_called_once_with()
+            self.assertFalse(in_use.logout.called)
+        in_use.logout.assert_called_once_with()
+
+        with self.assertRaises(IMAPClientError):
+            with self.pool.acquire():
+                pass
+
+    def test_invalid_max_size(self):
+        with self.assertRaises(ValueError):
+            IMAPClientPool(self.factory, max_size=0)
@@ -4,7 +4,7 @@
 
 import imaplib
 from datetime import date, datetime
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from imapclient.exceptions import InvalidCriteriaError
 from imapclient.imapclient import _quoted
@@ -162,3 +162,86 @@ class TestGmailSearch(TestSearchBase):
         self.check_call(
             [b"CHARSET", b"utf-8", b"X-GM-RAW", _quoted(b'"foo \xe2\x98\xb9"')]
         )
+
+
+class TestSearchFetch(IMAPClientTest):
+    def setUp(self):
+        super(TestSearchFetch, self).setUp()
+        imap = self.client._imap
+        imap._command.return_value = "tag"
+        imap._command_complete.return_value = ("OK", [b"done"])
+        imap._untagged_response.return_value = ("OK", [b"1 (UID 11 FLAGS (foo))"])
+
+    def test_searchres(self):
+        self.client._cached_capabilities = (b"SEARCHRES",)
+
+        result = self.client.search_fetch(["NOT", "DELETED"], ["FLAGS"])
+
+        self.assertEqual(
+            self.client._imap.sent, b"tag UID SEARCH RETURN (SAVE) NOT DELETED\r\n"
+        )
+        self.client._imap._command.assert_called_once_with(
+            "UID", "FETCH", b"$", "(FLAGS)", None
+        )
+        self.assertEqual(result, {11: {b"SEQ": 1, b"FLAGS": (b"foo",)}})
+
+    def test_searchres_search_failed(self):
+        self.client._cached_capabilities = (b"SEARCHRES",)
+        # imaplib raises for BAD rather than returning it
+        self.client._imap._command_complete.side_effect = [
+            imaplib.IMAP4.error("SEARCH command error: BAD [bad criteria]"),
+            imaplib.IMAP4.error("FETCH command error: BAD [no saved result]"),
+        ]
+
+        with self.assertRaises(InvalidCriteriaError) as cm:
+            self.client.search_fetch(["FOO"], ["FLAGS"])
+        self.assertIn(
+            "may have been caused by a syntax error in the criteria: ['FOO']",
+            str(cm.exception),
+        )
+        self.assertIn("bad criteria", str(cm.exception))
+        self.assertEqual(self.client._imap._command_complete.call_count, 2)
+
+    def test_searchres_search_failed_matches_search(self):
+        error = imaplib.IMAP4.error('SEARCH command error: BAD ["Unknown argument"]')
+        with patch.object(self.client, "_raw_command_untagged", side_effect=error):
+            with self.assertRaises(InvalidCriteriaError) as search_cm:
+                self.client.search("TOO some@email.com")
+
+        self.client._cached_capabilities = (b"SEARCHRES",)
+        self.client._imap._command_complete.side_effect = [error, ("OK", [])]
+        with self.assertRaises(InvalidCriteriaError) as search_fetch_cm:
+            self.client.search_fetch("TOO some@email.com", ["FLAGS"])
+
+        self.assertEqual(str(search_fetch_cm.exception), str(search_cm.exception))
+
+    def test_searchres_search_no(self):
+        self.client._cached_capabilities = (b"SEARCHRES",)
+        self.client._imap._command_complete.side_effect = [
+            ("NO", [b"can't search"]),
+            ("OK", [b"done"]),
+        ]
+
+        with self.assertRaises(imaplib.IMAP4.error) as cm:
+            self.client.search_fetch(["ALL"], ["FLAGS"])
+        self.assertIn("search", str(cm.exception))
+        self.assertEqual(self.client._imap._command_complete.call_count, 2)
+
+    def test_without_searchres(self):
+        self.client._cached_capabilities = (b"IMAP4REV1",)
+        self.client._raw_command_untagged = Mock(return_value=[b"11"])
+
+        result = self.client.search_fetch("ALL", ["FLAGS"])
+
+        self.client._raw_command_untagged.assert_called_once_with(b"SEARCH", [b"ALL"])
+        self.client._imap._command.assert_called_once_with(
+            "UID", "FETCH", b"11", "(FLAGS)", None
+        )
+        self.assertEqual(result, {11: {b"SEQ": 1, b"FLAGS": (b"foo",)}})
+
+    def test_without_searchres_no_matches(self):
+        self.client._cached_capabilities = (b"IMAP4REV1",)
+        self.client._raw_command_untagged = Mock(return_value=[b""])
+
+        self.assertEqual(self.client.search_fetch("ALL", ["FLAGS"]), {})
+        self.assertFalse(self.client._imap._command.called)
@@ -3,9 +3,19 @@
 # Released subject to the New BSD License
 # Please see http://en.wikipedia.org/wiki/BSD_licenses
 
-from unittest.mock import Mock, patch, sentinel
-
-from imapclient.imapclient import ANSWERED, DELETED, DRAFT, FLAGGED, RECENT, SEEN
+import inspect
+from unittest.mock import call, patch, sentinel
+
+from imapclient.imapclient import (
+    ANSWERED,
+    DELETED,
+    DRAFT,
+    FLAGGED,
+    IMAPClient,
+    Pipeline,
+    RECENT,
+    SEEN,
+)
 
 from .imapclient_test import IMAPClientTest
 
@@ -20,7 +30,8 @@ class TestFlagsConsts(IMAPClientTest):
 class TestFlags(IMAPClientTest):
     def setUp(self):
         super(TestFlags, self).setUp()
-        self.client._command_and_check = Mock()
+        self.client._imap._command.return_value = "tag"
+        self.client._imap._command_complete.return_value = ("OK", [b"done"])
 
     def test_get(self):
         with patch.object(
@@ -50,15 +61,21 @@ class TestFlags(IMAPClientTest):
         if silent:
             expected_command += b".SILENT"
 
-        cc = self.client._command_and_check
-        cc.return_value = [
-            b"11 (FLAGS (blah foo) UID 1)",
-            b"11 (UID 1 OTHER (dont))",
-            b"22 (FLAGS (foo) UID 2)",
-            b"22 (UID 2 OTHER (care))",
-        ]
+        imap = self.client._imap
+        imap._untagged_response.return_value = (
+            "OK",
+            [
+                b"11 (FLAGS (blah foo) UID 1)",
+                b"11 (UID 1 OTHER (dont))",
+                b"22 (FLAGS (foo) UID 2)",
+                b"22 (UID 2 OTHER (care))",
+            ],
+        )
         resp = meth([1, 2], "foo", silent=silent)
-        cc.assert_called_once_with("store", b"1,2", expected_command, "(foo)", uid=True)
+        imap._command.assert_called_once_with(
+            "UID", "STORE", b"1,2", expected_command, "(foo)"
+        )
+        imap._command_complete.assert_called_once_with("STORE", "tag")
         if silent:
             self.assertIsNone(resp)
         else:
@@ -70,13 +87,98 @@ class TestFlags(IMAPClientTest):
                 },
             )
 
-        cc.reset_mock()
+        imap.reset_mock()
+
+
+class TestBatchFlags(IMAPClientTest):
+    def setUp(self):
+        super(TestBatchFlags, self).setUp()
+        imap = self.client._imap
+        imap._command.side_effect = ["tag1", "tag2"]
+        imap._command_complete.return_value = ("OK", [b"done"])
+
+    def test_grouped(self):
+        imap = self.client._imap
+        imap._untagged_response.side_effect = [
+            ("OK", [b"11 (FLAGS (foo) UID 1)", b"12 (FLAGS (foo) UID 2)"]),
+            ("OK", [b"13 (FLAGS (bar) UID 3)"]),
+        ]
+
+        out = self.client.batch_flags(
+            [("add", [1], [b"foo"]), ("add", [2], ["foo"]), ("set", 3, "bar")]
+        )
+
+        self.assertEqual(
+            imap._command.call_args_list,
+            [
+                call("UID", "STORE", b"1,2", b"+FLAGS", "(foo)"),
+                call("UID", "STORE", b"3", b"FLAGS", "(bar)"),
+            ],
+        )
+        self.assertEqual(out, {1: (b"foo",), 2: (b"foo",), 3: (b"bar",)})
+
+    def test_conflicting_operations_keep_order(self):
+        imap = self.client._imap
+        imap._command.side_effect = ["tag1", "tag2", "tag3"]
+        imap._untagged_response.return_value = ("OK", [None])
+
+        self.client.batch_flags(
+            [
+                ("remove", [1], [b"\\Seen"]),
+                ("add", [1], [b"\\Seen"]),
+                ("remove", [1], [b"\\Seen"]),
+            ],
+            silent=True,
+        )
+
+        self.assertEqual(
+            imap._command.call_args_list,
+            [
+                call("UID", "STORE", b"1", b"-FLAGS.SILENT", "(\\Seen)"),
+                call("UID", "STORE", b"1", b"+FLAGS.SILENT", "(\\Seen)"),
+                call("UID", "STORE", b"1", b"-FLAGS.SILENT", "(\\Seen)"),
+            ],
+        )
+
+    def test_consecutive_duplicates_merged(self):
+        imap = self.client._imap
+        imap._untagged_response.return_value = ("OK", [None])
+
+        self.client.batch_flags(
+            [("add", [1], [b"foo"]), ("add", [1], [b"foo"])], silent=True
+        )
+
+        imap._command.assert_called_once_with(
+            "UID", "STORE", b"1", b"+FLAGS.SILENT", "(foo)"
+        )
+
+    def test_silent(self):
+        imap = self.client._imap
+        imap._untagged_response.return_value = ("OK", [None])
+
+        out = self.client.batch_flags([("remove", [1, 2], [b"foo"])], silent=True)
+
+        imap._command.assert_called_once_with(
+            "UID", "STORE", b"1,2", b"-FLAGS.SILENT", "(foo)"
+        )
+        self.assertIsNone(out)
+
+    def test_unknown_action(self):
+        with self.assertRaises(ValueError):
+            self.client.batch_flags([("toggle", [1], [b"foo"])])
+        self.assertFalse(self.client._imap._command.called)
+
+    def test_store_signature_matches_pipeline(self):
+        self.assertEqual(
+            inspect.signature(IMAPClient._store), inspect.signature(Pipeline._store)
+        )
 
 
 class TestGmailLabels(IMAPClientTest):
     def setUp(self):
         super(TestGmailLabels, self).setUp()
-        self.client._command_and_check = Mock()
+        self.client._imap._command.return_value = "tag"
+        self.client._imap._command_complete.return_value = ("OK", [b"done"])
 
     def test_get(self):
         with patch.object(
@@ -109,17 +211,21 @@ class TestGmailLabels(IMAPClientTest):
         if silent:
             expected_command += b".SILENT"
 
-        cc = self.client._command_and_check
-        cc.return_value = [
-            b'11 (X-GM-LABELS (&AUE-abel "f\\"o\\"o") UID 1)',
-            b'22 (X-GM-LABELS ("f\\"o\\"o") UID 2)',
-            b"11 (UID 1 FLAGS (dont))",
-            b"22 (UID 2 FLAGS (care))",
-        ]
+        imap = self.client._imap
+        imap._untagged_response.return_value = (
+            "OK",
+            [
+                b'11 (X-GM-LABELS (&AUE-abel "f\\"o\\"o") UID 1)',
+                b'22 (X-GM-LABELS ("f\\"o\\"o") UID 2)',
+                b"11 (UID 1 FLAGS (dont))",
+                b"22 (UID 2 FLAGS (care))",
+            ],
+        )
         resp = meth([1, 2], 'f"o"o', silent=silent)
-        cc.assert_called_once_with(
-            "store", b"1,2", expected_command, '("f\\"o\\"o")', uid=True
+        imap._command.assert_called_once_with(
+            "UID", "STORE", b"1,2", expected_command, '("f\\"o\\"o")'
         )
+        imap._command_complete.assert_called_once_with("STORE", "tag")
         if silent:
             self.assertIsNone(resp)
         else:
@@ -133,4 +239,4 @@ class TestGmailLabels(IMAPClientTest):
                 },
             )
 
-        cc.reset_mock()
+        imap.reset_mock()
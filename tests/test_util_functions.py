@@ -113,6 +113,35 @@ class Test_join_message_ids(unittest.TestCase):
     def test_iter(self):
         self.check(iter([123, 99]), b"123,99")
 
+    def test_int_list(self):
+        self.check([1, 22, 333], b"1,22,333")
+
+    def test_contiguous_int_list(self):
+        self.check([3, 1, 2, 4], b"1:4")
+
+    def test_int_list_with_duplicates(self):
+        self.check([1, 2, 2], b"1:2")
+
+    def test_int_tuple_compressed(self):
+        self.check((5, 3, 4, 4), b"3:5")
+
+    def test_two_ints_sent_as_given(self):
+        self.check([5, 3], b"5,3")
+        self.check([3, 4], b"3,4")
+        self.check((2, 2), b"2,2")
+
+    def test_int_list_runs(self):
+        self.check([7, 1, 2, 3, 9, 10, 5], b"1:3,5,7,9:10")
+
+    def test_range(self):
+        self.check(range(10, 21), b"10:20")
+
+    def test_range_single(self):
+        self.check(range(5, 6), b"5")
+
+    def test_range_with_step(self):
+        self.check(range(1, 8, 3), b"1,4,7")
+
 
 class Test_normalise_search_criteria(unittest.TestCase):
     def check(self, criteria, charset, expected):